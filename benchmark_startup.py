@@ -0,0 +1,116 @@
+"""
+Compares the startup time (and memory) of the programs with the JSON files and with the binary club snapshot.
+
+python benchmark_startup.py
+python benchmark_startup.py --players 100000 --tournaments 5000
+
+The data is generated in a temporary folder. Each measure runs in a new process,
+so that nothing is cached between them.
+"""
+import argparse
+import json
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from models import ClubManager, TournamentManager
+
+CLUB_SIZE = 5000
+
+
+def chess_id(index):
+    """Unique chess ID (two letters, five digits) of the generated player number index"""
+    letters = index // 100000
+    return f"{chr(65 + letters % 26)}{chr(65 + letters // 26 % 26)}{index % 100000:05d}"
+
+
+def generate(folder, players, tournaments):
+    clubs_folder = folder / "clubs"
+    tournaments_folder = folder / "tournaments"
+    clubs_folder.mkdir()
+    tournaments_folder.mkdir()
+
+    for number in range(0, players, CLUB_SIZE):
+        club_players = [
+            {
+                "name": f"Player {index}",
+                "email": f"player{index}@example.com",
+                "chess_id": chess_id(index),
+                "birthday": f"{random.randint(1, 28):02d}-{random.randint(1, 12):02d}-{random.randint(1940, 2015)}",
+            }
+            for index in range(number, min(number + CLUB_SIZE, players))
+        ]
+        with open(clubs_folder / f"club{number // CLUB_SIZE}.json", "w") as fp:
+            json.dump({"name": f"Club {number // CLUB_SIZE}", "players": club_players}, fp)
+
+    with open("data/tournaments/completed.json") as fp:
+        tournament = json.load(fp)
+    for number in range(tournaments):
+        with open(tournaments_folder / f"tournament{number}.json", "w") as fp:
+            json.dump({**tournament, "name": f"Tournament {number}"}, fp)
+    return clubs_folder, tournaments_folder
+
+
+def peak_memory():
+    """Peak memory of the process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def measure(kind, folder):
+    """Runs in the child process: prints the peak memory and the time to start
+    (and to find a first player in the clubs)"""
+    start = time.perf_counter()
+    if kind == "tournaments":
+        TournamentManager(folder, workers=1).list_tournaments()
+        print(peak_memory(), time.perf_counter() - start)
+        return
+
+    manager = ClubManager(folder, workers=1, snapshot=kind == "snapshot")
+    [club.name for club in manager.clubs]
+    started = time.perf_counter()
+    manager.find_by_chess_id("AA00000")
+    print(peak_memory(), started - start, time.perf_counter() - started)
+
+
+def run(kind, folder):
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", kind, str(folder)], capture_output=True, text=True, check=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup with JSON files and the club snapshot.")
+    parser.add_argument("--players", type=int, default=100000, help="number of players (in clubs of 5000)")
+    parser.add_argument("--tournaments", type=int, default=5000, help="number of tournaments")
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        sys.exit()
+
+    folder = Path(tempfile.mkdtemp())
+    try:
+        clubs_folder, tournaments_folder = generate(folder, args.players, args.tournaments)
+        print(f"{args.players} players, {args.tournaments} tournaments")
+        print(f"{'':<40}{'startup':>10}{'first lookup':>15}{'peak memory':>15}")
+        for label, kind, data_folder in (
+            ("clubs, JSON files", "json", clubs_folder),
+            ("clubs, snapshot (written)", "snapshot", clubs_folder),
+            ("clubs, snapshot", "snapshot", clubs_folder),
+            ("tournaments, catalog (written)", "tournaments", tournaments_folder),
+            ("tournaments, catalog", "tournaments", tournaments_folder),
+        ):
+            memory, startup, *lookup = run(kind, data_folder)
+            lookup = f"{lookup[0]:.3f}s" if lookup else "-"
+            print(f"{label:<40}{startup:>9.3f}s{lookup:>15}{memory:>13.0f}MB")
+    finally:
+        shutil.rmtree(folder)
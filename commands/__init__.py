@@ -1,3 +1,4 @@
+from .chess_id_duplicates import ChessIdDuplicatesCmd
 from .club_list import ClubListCmd
 from .create_club import ClubCreateCmd
 from .exit import ExitCmd
@@ -5,6 +6,7 @@ from .noop import NoopCmd
 from .update_player import PlayerUpdateCmd
 
 __all__ = [
+    "ChessIdDuplicatesCmd",
     "ClubCreateCmd",
     "ExitCmd",
     "ClubListCmd",
@@ -0,0 +1,12 @@
+from commands.context import Context
+from models import get_club_manager
+
+from .base import BaseCommand
+
+
+class ChessIdDuplicatesCmd(BaseCommand):
+    """Command to get the chess IDs given to several players"""
+
+    def execute(self):
+        cm = get_club_manager()
+        return Context("chess-id-duplicates", duplicates=cm.chess_id_duplicates())
@@ -1,5 +1,5 @@
 from commands.context import Context
-from models import ClubManager
+from models import get_club_manager
 
 from .base import BaseCommand
 
@@ -8,5 +8,5 @@ class ClubListCmd(BaseCommand):
     """Command to get the list of clubs"""
 
     def execute(self):
-        cm = ClubManager()
+        cm = get_club_manager()
         return Context("main-menu", clubs=cm.clubs)
@@ -1,73 +1,156 @@
 from pathlib import Path
 import re
-from datetime import datetime
+import time
+from datetime import date, datetime
 
-from models import ClubManager, Tournament, TournamentManager
+from exporters import EXPORTERS, report_filename, standings, tournament_info
+from exporters.report_cache import is_up_to_date, report_key, write_report
+from models import (
+    PAIRING_STRATEGIES,
+    TIEBREAKS,
+    RatingEngine,
+    Tournament,
+    get_club_manager,
+    make_tournament_manager,
+)
 
 
 class TournamentController:
+    # Formats of the reports, the default one first
+    REPORT_FORMATS = list(EXPORTERS)
+    # Seconds between two refreshes of the club manager (a refresh checks every club file)
+    CLUB_REFRESH_INTERVAL = 1.0
+
     def __init__(self):
-        self.club_manager = ClubManager()
-        self.tournament_manager = TournamentManager()
+        self.tournament_manager = make_tournament_manager()
+        self._club_manager = None
+        self._club_refreshed_at = 0
+        self._rating_engine = None
+
+    @property
+    def club_manager(self):
+        # Shared manager (see get_club_manager), refreshed with the changed club files at most once per interval
+        now = time.monotonic()
+        if self._club_manager is None:
+            self._club_manager = get_club_manager()
+            self._club_refreshed_at = now
+        elif now - self._club_refreshed_at >= self.CLUB_REFRESH_INTERVAL:
+            self._club_manager.refresh()
+            self._club_refreshed_at = now
+        return self._club_manager
+
+    @property
+    def rating_engine(self):
+        # The rating state is only read when it is used
+        if self._rating_engine is None:
+            self._rating_engine = RatingEngine(self.tournament_manager)
+        return self._rating_engine
 
     def get_player_by_chess_id(self, chess_id):
-        for club in self.club_manager.clubs:
-            for player in club.players:
-                if player.chess_id == chess_id:
-                    return player
-        return None
+        # Only returns a player if the chess ID is not a duplicate (see ClubManager.chess_id_duplicates)
+        owners = self.club_manager.chess_id_owners(chess_id)
+        if len(owners) != 1:
+            return None
+        return owners[0][1]
+
+    def get_players_by_name(self, name):
+        if not name.strip():
+            return []
+        return self.club_manager.find_by_name(name)
 
     def get_player_by_name(self, name):
-        value = name.strip().lower()
-        if not value:
+        # Only returns a player if the name is not ambiguous (see get_players_by_name)
+        players = self.get_players_by_name(name)
+        if len(players) != 1:
             return None
-        for club in self.club_manager.clubs:
-            for player in club.players:
-                if player.name.strip().lower() == value:
-                    return player
-        return None
-
-    def _player_name(self, chess_id):
-        player = self.get_player_by_chess_id(chess_id)
-        if player is None:
-            return chess_id
-        return player.name
+        return players[0]
+
+    def search_players(self, query, limit=10):
+        """Players best matching a partial or misspelled name, or a chess ID (prefix)"""
+        if not query.strip():
+            return []
+        return self.club_manager.search_players(query, limit=limit)
+
+    def _name_resolver(self):
+        """Returns a function turning the players stored in a tournament (names or chess IDs) into names,
+        for one operation: each player is looked up once, in the same club manager"""
+        club_manager = self.club_manager
+        names = {}
+
+        def player_name(value):
+            name = names.get(value)
+            if name is None:
+                # Only a chess ID that is not a duplicate gives a name (see get_player_by_chess_id)
+                owners = club_manager.chess_id_owners(value)
+                name = names[value] = owners[0][1].name if len(owners) == 1 else value
+            return name
+
+        return player_name
 
     def _resolve_winner_for_match(self, tournament, round_number, match_number, winner):
         if winner is None:
             return None
 
-        round_index = round_number - 1
-        match_index = match_number - 1
-        if round_index < 0 or round_index >= len(tournament._rounds):
-            return winner
-
-        current_round = tournament._rounds[round_index]
-        if match_index < 0 or match_index >= len(current_round.matches):
+        match = tournament.get_match(round_number, match_number)
+        if match is None:
             return winner
 
-        match = current_round.matches[match_index]
-        match_players = match.players
+        match_players = (match.player_one_id, match.player_two_id)
 
         normalized_winner = winner.strip().lower()
         for player_value in match_players:
             if player_value.strip().lower() == normalized_winner:
                 return player_value
 
-        player = self.get_player_by_name(winner)
-        if player is None:
-            return winner
-
-        for player_value in match_players:
-            value = player_value.strip()
-            if value == player.chess_id or value.lower() == player.name.strip().lower():
-                return player_value
+        # Several players can share a name: use the one playing this match. Only exact names and chess IDs
+        # are accepted (a result is never recorded for a guessed player)
+        candidates = self.get_players_by_name(winner)
+        player = self.get_player_by_chess_id(winner.strip())
+        if player is not None:
+            candidates.append(player)
+        resolved = {
+            player_value
+            for player in candidates
+            for player_value in match_players
+            if player_value.strip() == player.chess_id or player_value.strip().lower() == player.name.strip().lower()
+        }
+        if len(resolved) == 1:
+            return resolved.pop()
 
+        # Unknown or ambiguous: the winner is reported as not playing the match
         return winner
 
+    def has_played(self, tournament, player_one, player_two):
+        return tournament.has_played(player_one, player_two)
+
+    def get_opponents(self, tournament, player):
+        return tournament.opponents_of(player)
+
     def list_tournaments(self, include_completed=None):
+        """Returns a list of (filepath, summary): see load_tournament to get a tournament"""
         return self.tournament_manager.list_tournaments(include_completed=include_completed)
 
+    def load_tournament(self, filepath):
+        return self.tournament_manager.load_tournament(filepath)
+
+    def find_tournaments(self, player=None, venue=None, year=None, completed=None):
+        """Returns a list of (filepath, summary) matching the criteria given, without loading the tournaments.
+
+        Tournaments store players by name or by chess ID: both are looked up for the player.
+        """
+        criteria = {"venue": venue or None, "completed": completed}
+        if player:
+            identifiers = {player.strip()}
+            found_players = self.get_players_by_name(player)
+            found_players += self.club_manager.find_by_chess_id(player.strip().upper())
+            for found_player in found_players:
+                identifiers.update([found_player.name, found_player.chess_id])
+            criteria["player"] = sorted(identifiers)
+        if year is not None:
+            criteria["date_from"] = date(year, 1, 1)
+            criteria["date_to"] = date(year, 12, 31)
+        return self.tournament_manager.find_tournaments(**criteria)
+
     def _sanitize_filename(self, text):
         normalized = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
         if not normalized:
@@ -80,12 +163,22 @@ class TournamentController:
         base = self._sanitize_filename(tournament_name)
         filepath = tournaments_dir / f"{base}.json"
         i = 2
-        while filepath.exists():
+        while self.tournament_manager.is_filepath_taken(filepath):
             filepath = tournaments_dir / f"{base}-{i}.json"
             i += 1
         return filepath
 
-    def create_tournament(self, name, venue, start_date_text, end_date_text, number_of_rounds, player_names):
+    def create_tournament(
+        self,
+        name,
+        venue,
+        start_date_text,
+        end_date_text,
+        number_of_rounds,
+        player_names,
+        pairing="swiss",
+        tiebreaks=None,
+    ):
         if not player_names:
             return {"ok": False, "message": "Please provide at least two players."}
 
@@ -108,6 +201,12 @@ class TournamentController:
         if number_of_rounds is None or number_of_rounds <= 0:
             return {"ok": False, "message": "Number of rounds must be a positive integer."}
 
+        if pairing not in PAIRING_STRATEGIES:
+            return {"ok": False, "message": f"Pairing must be one of: {', '.join(PAIRING_STRATEGIES)}."}
+
+        if tiebreaks is not None and any(tiebreak not in TIEBREAKS for tiebreak in tiebreaks):
+            return {"ok": False, "message": f"Tiebreaks must be among: {', '.join(TIEBREAKS)}."}
+
         try:
             start_date = datetime.strptime(start_date_text, Tournament.DATE_FORMAT).date()
             end_date = datetime.strptime(end_date_text, Tournament.DATE_FORMAT).date()
@@ -116,12 +215,15 @@ class TournamentController:
 
         players = []
         missing = []
+        ambiguous = []
         for player_name in unique_names:
-            player = self.get_player_by_name(player_name)
-            if player is None:
+            found_players = self.get_players_by_name(player_name)
+            if not found_players:
                 missing.append(player_name)
+            elif len(found_players) > 1:
+                ambiguous.append(player_name)
             else:
-                players.append(player)
+                players.append(found_players[0])
 
         if missing:
             return {
@@ -129,14 +231,22 @@ class TournamentController:
                 "message": f"Player(s) not found: {', '.join(missing)}",
             }
 
+        if ambiguous:
+            return {
+                "ok": False,
+                "message": f"Several players share the name(s): {', '.join(ambiguous)}",
+            }
+
         filepath = self._next_tournament_filepath(name)
-        tournament = Tournament(
+        tournament = self.tournament_manager.new_tournament(
             name=name,
             venue=venue,
             start_date=start_date,
             end_date=end_date,
             number_of_rounds=number_of_rounds,
             filepath=filepath,
+            pairing=pairing,
+            tiebreaks=tiebreaks,
         )
         for player in players:
             tournament.register_player(player)
@@ -145,76 +255,33 @@ class TournamentController:
         return {"ok": True, "filepath": filepath, "tournament": tournament}
 
     def get_basic_info(self, tournament):
-        data = tournament.serialize()
-        return {
-            "name": tournament.name,
-            "venue": tournament.venue,
-            "from": tournament.start_date.strftime(tournament.DATE_FORMAT),
-            "to": tournament.end_date.strftime(tournament.DATE_FORMAT),
-            "number_of_rounds": tournament.number_of_rounds,
-            "current_round": data["current_round"],
-            "completed": tournament._completed,
-        }
+        return tournament_info(tournament)
 
     def get_points(self, tournament):
-        ranking = tournament.standings()
-        rows = []
-        for row in ranking:
-            player_name = row["player_name"]
-            rows.append(
-                {
-                    "player_name": self._player_name(player_name),
-                    "points": row["points"],
-                }
-            )
-        return rows
+        return standings(tournament, self._name_resolver())
 
-    def export_report(self, tournament):
-        safe_name = tournament.name.lower().replace(" ", "-")
+    def export_report(self, tournament, report_format="text", force=False):
+        """Writes the report of the tournament in data/reports (formats: see exporters.EXPORTERS).
+
+        The report is only written again when the tournament, or the names of its players, changed
+        since it was written (or when force is True).
+        """
+        player_name = self._name_resolver()
+        exporter = EXPORTERS[report_format](player_name=player_name)
         reports_dir = Path("data/reports")
         reports_dir.mkdir(parents=True, exist_ok=True)
-        filepath = reports_dir / f"{safe_name}-report.txt"
-
-        lines = []
-        info = self.get_basic_info(tournament)
-        lines.append(f"Tournament report: {info['name']}")
-        lines.append(f"Venue: {info['venue']}")
-        lines.append(f"From: {info['from']}")
-        lines.append(f"To: {info['to']}")
-        lines.append(f"Number of rounds: {info['number_of_rounds']}")
-        lines.append(f"Completed: {info['completed']}")
-        lines.append("")
-
-        lines.append("Standings:")
-        ranking = self.get_points(tournament)
-        for idx, row in enumerate(ranking, 1):
-            lines.append(f"{idx}. {row['player_name']} - {row['points']} pts")
-        lines.append("")
-
-        lines.append("Rounds:")
-        rounds_data = tournament.serialize()["rounds"]
-        for round_index, round_matches in enumerate(rounds_data, 1):
-            lines.append(f"Round {round_index}:")
-            for match in round_matches:
-                p1 = match["players"][0]
-                p2 = match["players"][1]
-                winner = match.get("winner")
-                completed = match.get("completed", False)
-                p1_name = self._player_name(p1)
-                p2_name = self._player_name(p2)
-
-                if not completed:
-                    result = "not completed"
-                elif winner is None:
-                    result = "draw"
-                else:
-                    result = f"winner: {self._player_name(winner)}"
-
-                lines.append(f"- {p1_name} vs {p2_name} ({result})")
-            lines.append("")
-
-        filepath.write_text("\n".join(lines))
-        return filepath
+        filepath = reports_dir / report_filename(tournament.name, exporter.extension)
+
+        key = report_key(
+            type(exporter),
+            self.tournament_manager.state_key(tournament.filepath),
+            tournament._player_names,
+            player_name,
+        )
+        if not force and is_up_to_date(filepath, key):
+            return {"filepath": filepath, "written": False}
+        write_report(exporter, filepath, tournament, key)
+        return {"filepath": filepath, "written": True}
 
     def start_or_advance_round(self, tournament):
         round_value = tournament.advance_round()
@@ -232,4 +299,47 @@ class TournamentController:
         updated_match = tournament.set_match_result(round_number, match_number, resolved_winner)
         if updated_match is not None:
             self.tournament_manager.save_tournament(tournament)
+            self.rating_engine.update_tournament(tournament)
         return updated_match
+
+    def set_match_results(self, tournament, results):
+        """Records several results (round number, match number, winner) and saves the tournament once"""
+        if not results:
+            return {"ok": False, "message": "No results provided."}
+
+        resolved_results = []
+        for round_number, match_number, winner in results:
+            match = tournament.get_match(round_number, match_number)
+            if match is None:
+                return {"ok": False, "message": f"Match {match_number} of round {round_number} does not exist."}
+
+            resolved_winner = self._resolve_winner_for_match(
+                tournament=tournament,
+                round_number=round_number,
+                match_number=match_number,
+                winner=winner,
+            )
+            if resolved_winner is not None and not match.has_player(resolved_winner):
+                return {
+                    "ok": False,
+                    "message": f"{winner} does not play match {match_number} of round {round_number}.",
+                }
+            resolved_results.append((round_number, match_number, resolved_winner))
+
+        updated_matches = tournament.set_match_results(resolved_results)
+        if updated_matches is None:
+            return {"ok": False, "message": "Could not set results."}
+
+        self.tournament_manager.save_tournament(tournament)
+        self.rating_engine.update_tournament(tournament)
+        return {"ok": True, "matches": updated_matches}
+
+    def get_ratings(self, limit=20):
+        """Rates the rounds completed since the last update, then returns the best ratings
+        (player name, rating, number of games)"""
+        self.rating_engine.update()
+        player_name = self._name_resolver()
+        return [
+            {"player_name": player_name(player), "rating": rating, "games": games}
+            for player, rating, games in self.rating_engine.ranking()[:limit]
+        ]
@@ -0,0 +1,51 @@
+"""
+Exports the reports of all the tournaments (or of the tournaments matching the filters) to data/reports,
+with a pool of processes.
+
+python export_reports.py
+python export_reports.py --format html --completed --year 2023
+python export_reports.py --player "Alice Smith" --workers 4 --output reports
+"""
+import argparse
+from pathlib import Path
+
+from controllers.tournament_controller import TournamentController
+from exporters import EXPORTERS
+from exporters.bulk import export_reports
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the reports of many tournaments.")
+    parser.add_argument("--format", choices=list(EXPORTERS), default="text", help="report format")
+    parser.add_argument("--player", type=str, default=None, help="tournaments of a player (name or chess ID)")
+    parser.add_argument("--venue", type=str, default=None, help="tournaments at a venue")
+    parser.add_argument("--year", type=int, default=None, help="tournaments taking place this year")
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument("--completed", action="store_const", const=True, dest="completed", help="completed only")
+    status.add_argument("--in-progress", action="store_const", const=False, dest="completed", help="in progress only")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--output", type=str, default="data/reports", help="reports folder")
+    parser.add_argument("--force", action="store_true", help="also write the reports of unchanged tournaments")
+
+    args = parser.parse_args()
+    controller = TournamentController()
+    entries = controller.find_tournaments(
+        player=args.player, venue=args.venue, year=args.year, completed=args.completed
+    )
+    # Built once, and shared by the processes writing the reports
+    player_names = controller.club_manager.player_names()
+
+    stats = export_reports(
+        controller.tournament_manager,
+        entries,
+        EXPORTERS[args.format],
+        Path(args.output),
+        player_names,
+        workers=args.workers,
+        force=args.force,
+    )
+    for filepath in stats["failed"]:
+        print(filepath, "could not be exported.")
+    seconds = max(stats["seconds"], 1e-9)
+    print(f"{stats['reports']} reports written to {args.output} in {stats['seconds']:.2f}s", end="")
+    print(f" ({stats['unchanged']} unchanged tournaments skipped)")
+    print(f"{stats['reports'] / seconds:.1f} tournaments/s, {stats['matches'] / seconds:.0f} matches/s")
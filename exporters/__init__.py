@@ -0,0 +1,25 @@
+from .base import ReportExporter, report_filename, standings, tournament_info
+from .csv_report import CsvExporter
+from .html_report import HtmlExporter
+from .jsonl_report import JsonLinesExporter
+from .text_report import TextExporter
+
+# Report formats, by name
+EXPORTERS = {
+    "text": TextExporter,
+    "csv": CsvExporter,
+    "jsonl": JsonLinesExporter,
+    "html": HtmlExporter,
+}
+
+__all__ = [
+    "EXPORTERS",
+    "CsvExporter",
+    "HtmlExporter",
+    "JsonLinesExporter",
+    "ReportExporter",
+    "TextExporter",
+    "report_filename",
+    "standings",
+    "tournament_info",
+]
@@ -0,0 +1,93 @@
+from abc import ABCMeta, abstractmethod
+
+
+def report_filename(tournament_name, extension):
+    safe_name = tournament_name.lower().replace(" ", "-")
+    return f"{safe_name}-report.{extension}"
+
+
+def tournament_info(tournament):
+    """Returns the dict of the tournament attributes shown in the reports"""
+    header = tournament.header()
+    return {
+        "name": header["name"],
+        "venue": header["venue"],
+        "from": header["dates"]["from"],
+        "to": header["dates"]["to"],
+        "number_of_rounds": header["number_of_rounds"],
+        "current_round": header["current_round"],
+        "completed": header["completed"],
+    }
+
+
+def standings(tournament, player_name):
+    """Returns the ranking rows (player name, points, tiebreaks); player_name turns the players
+    stored in the tournament (names or chess IDs) into names"""
+    return [
+        {
+            "player_name": player_name(row["player_name"]),
+            "points": row["points"],
+            "tiebreaks": row["tiebreaks"],
+        }
+        for row in tournament.standings()
+    ]
+
+
+class ReportExporter(metaclass=ABCMeta):
+    """
+    Base class for the tournament report formats.
+
+    The report is written while it is generated: the rounds are read one match at a time
+    from the Round and Match objects, so the memory used does not grow with the tournament.
+    """
+
+    # Extension of the report files
+    extension = None
+
+    def __init__(self, player_name=None):
+        # Turns the players stored in the tournament (names or chess IDs) into names
+        self.player_name = player_name or (lambda value: value)
+
+    def export(self, filepath, info, standings, rounds):
+        """Writes the report to filepath.
+
+        - info is the dict of the tournament attributes (see TournamentController.get_basic_info)
+        - standings is the list of ranking rows (see TournamentController.get_points)
+        - rounds yields (round number, Round) (see Tournament.iter_rounds)
+        """
+        with open(filepath, "w", newline="") as fp:
+            fp.writelines(self.chunks(info, standings, rounds))
+        return filepath
+
+    def export_tournament(self, filepath, tournament):
+        """Writes the report of a tournament to filepath"""
+        return self.export(
+            filepath,
+            info=tournament_info(tournament),
+            standings=standings(tournament, self.player_name),
+            rounds=tournament.iter_rounds(),
+        )
+
+    @abstractmethod
+    def chunks(self, info, standings, rounds):
+        """Abstract method: yields the report text, piece by piece"""
+        pass
+
+    def result(self, match):
+        if not match.completed:
+            return "not completed"
+        if match.winner is None:
+            return "draw"
+        return f"winner: {self.player_name(match.winner)}"
+
+    def match_rows(self, rnd):
+        """Yields (match number, player one, player two, result, winner) for the matches of a round"""
+        for match_number, match in enumerate(rnd.matches, 1):
+            winner = self.player_name(match.winner) if match.completed and match.winner is not None else None
+            yield (
+                match_number,
+                self.player_name(match.player_one_id),
+                self.player_name(match.player_two_id),
+                self.result(match),
+                winner,
+            )
@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from models.loader import PARALLEL_MIN_FILES, default_workers
+from models.storage import database_path
+from models.tournament import Tournament
+
+from .base import report_filename
+from .report_cache import is_up_to_date, report_key, write_report
+
+# State of the export processes (see init_worker)
+_worker = {}
+
+
+def report_filepaths(entries, reports_dir, extension):
+    """Returns the list of (tournament filepath, report filepath) for the (filepath, summary) entries.
+
+    Reports are named after the tournaments (like the reports exported from the menu);
+    tournaments with the same name get numbered reports, so that no report is overwritten.
+    """
+    taken = set()
+    filepaths = []
+    for filepath, summary in entries:
+        filename = report_filename(summary.name, extension)
+        i = 2
+        while filename in taken:
+            filename = report_filename(f"{summary.name} {i}", extension)
+            i += 1
+        taken.add(filename)
+        filepaths.append((filepath, reports_dir / filename))
+    return filepaths
+
+
+def init_worker(exporter_class, player_names):
+    """Runs once in each process: player_names (chess ID -> name) is shared by all the reports
+    written by the process, instead of looking up every player in the clubs"""
+    _worker["exporter"] = exporter_class(player_name=lambda value: player_names.get(value, value))
+    # Only the tournaments are read (not the catalog of a tournament manager)
+    db_path = database_path()
+    if db_path:
+        from models.sqlite_storage import connect, load_tournament
+
+        _worker["read"] = partial(load_tournament, connect(db_path))
+    else:
+        _worker["read"] = Tournament.load
+
+
+def export_one(task):
+    """Writes one report, returns the number of matches written (None if the tournament could not be read,
+    or the report could not be written)"""
+    tournament_filepath, report_filepath, key = task
+    try:
+        tournament = _worker["read"](tournament_filepath)
+    except (OSError, ValueError, KeyError):
+        return None
+    try:
+        write_report(_worker["exporter"], report_filepath, tournament, key)
+    except OSError:
+        return None
+    return sum(len(rnd.matches) for _, rnd in tournament.iter_rounds())
+
+
+def export_reports(manager, entries, exporter_class, reports_dir, player_names, workers=None, force=False):
+    """Writes the reports of the (filepath, summary) entries of manager to reports_dir with a pool of processes.
+
+    Only the reports of the tournaments changed since their last export are written, unless force is True
+    (see report_cache): the other tournaments are not read.
+    Returns the statistics of the export: reports written, reports unchanged, matches, tournaments that could
+    not be exported (list of filepaths: not readable, or their report could not be written), and seconds.
+    """
+    if workers is None:
+        workers = default_workers()
+
+    start = time.perf_counter()
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    summaries = dict(entries)
+
+    def player_name(value):
+        return player_names.get(value, value)
+
+    tasks = []
+    unchanged = 0
+    for filepath, report_filepath in report_filepaths(entries, reports_dir, exporter_class.extension):
+        key = report_key(exporter_class, manager.state_key(filepath), summaries[filepath].players, player_name)
+        if not force and is_up_to_date(report_filepath, key):
+            unchanged += 1
+        else:
+            tasks.append((filepath, report_filepath, key))
+
+    if not tasks:
+        results = []
+    elif workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+        init_worker(exporter_class, player_names)
+        results = [export_one(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(exporter_class, player_names)
+        ) as executor:
+            results = list(executor.map(export_one, tasks, chunksize=chunksize))
+
+    return {
+        "reports": sum(1 for result in results if result is not None),
+        "unchanged": unchanged,
+        "matches": sum(result for result in results if result is not None),
+        "failed": [filepath for (filepath, _, _), result in zip(tasks, results) if result is None],
+        "seconds": time.perf_counter() - start,
+    }
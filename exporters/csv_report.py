@@ -0,0 +1,34 @@
+import csv
+
+from .base import ReportExporter
+
+
+class Echo:
+    """File-like object returning what is written: csv.writer(Echo()).writerow(row) returns the CSV line"""
+
+    def write(self, value):
+        return value
+
+
+class CsvExporter(ReportExporter):
+    """CSV report: the tournament attributes, then the standings and the matches, each table with a header row"""
+
+    extension = "csv"
+
+    def chunks(self, info, standings, rounds):
+        writer = csv.writer(Echo())
+
+        for key, value in info.items():
+            yield writer.writerow([key, value])
+        yield writer.writerow([])
+
+        tiebreak_names = list(standings[0]["tiebreaks"]) if standings else []
+        yield writer.writerow(["rank", "player", "points", *tiebreak_names])
+        for idx, row in enumerate(standings, 1):
+            yield writer.writerow([idx, row["player_name"], row["points"], *row["tiebreaks"].values()])
+        yield writer.writerow([])
+
+        yield writer.writerow(["round", "match", "player_one", "player_two", "result", "winner"])
+        for round_number, rnd in rounds:
+            for match_number, player_one, player_two, result, winner in self.match_rows(rnd):
+                yield writer.writerow([round_number, match_number, player_one, player_two, result, winner or ""])
@@ -0,0 +1,39 @@
+from html import escape
+
+from .base import ReportExporter
+
+
+class HtmlExporter(ReportExporter):
+    """HTML report (a single page, without external resources)"""
+
+    extension = "html"
+
+    def chunks(self, info, standings, rounds):
+        name = escape(info["name"])
+        yield f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{name}</title>\n</head>\n<body>\n'
+        yield f"<h1>Tournament report: {name}</h1>\n<ul>\n"
+        for label, key in (
+            ("Venue", "venue"),
+            ("From", "from"),
+            ("To", "to"),
+            ("Number of rounds", "number_of_rounds"),
+            ("Completed", "completed"),
+        ):
+            yield f"<li>{label}: {escape(str(info[key]))}</li>\n"
+        yield "</ul>\n"
+
+        tiebreak_names = list(standings[0]["tiebreaks"]) if standings else []
+        yield "<h2>Standings</h2>\n<table>\n<tr><th>Rank</th><th>Player</th><th>Points</th>"
+        yield "".join(f"<th>{escape(tiebreak)}</th>" for tiebreak in tiebreak_names) + "</tr>\n"
+        for idx, row in enumerate(standings, 1):
+            cells = [idx, row["player_name"], row["points"], *row["tiebreaks"].values()]
+            yield "<tr>" + "".join(f"<td>{escape(str(cell))}</td>" for cell in cells) + "</tr>\n"
+        yield "</table>\n"
+
+        yield "<h2>Rounds</h2>\n"
+        for round_number, rnd in rounds:
+            yield f"<h3>Round {round_number}</h3>\n<ol>\n"
+            for _, player_one, player_two, result, _ in self.match_rows(rnd):
+                yield f"<li>{escape(player_one)} vs {escape(player_two)} ({escape(result)})</li>\n"
+            yield "</ol>\n"
+        yield "</body>\n</html>\n"
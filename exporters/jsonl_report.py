@@ -0,0 +1,27 @@
+import json
+
+from .base import ReportExporter
+
+
+class JsonLinesExporter(ReportExporter):
+    """JSON lines report: one object per line, its "type" being "tournament", "standing" or "match" """
+
+    extension = "jsonl"
+
+    def chunks(self, info, standings, rounds):
+        yield json.dumps({"type": "tournament", **info}) + "\n"
+
+        for idx, row in enumerate(standings, 1):
+            yield json.dumps({"type": "standing", "rank": idx, **row}) + "\n"
+
+        for round_number, rnd in rounds:
+            for match_number, player_one, player_two, result, winner in self.match_rows(rnd):
+                match = {
+                    "type": "match",
+                    "round": round_number,
+                    "match": match_number,
+                    "players": [player_one, player_two],
+                    "result": result,
+                    "winner": winner,
+                }
+                yield json.dumps(match) + "\n"
@@ -0,0 +1,35 @@
+import hashlib
+import json
+from pathlib import Path
+
+# Changes when the content of the reports changes: all the reports are written again
+REPORT_VERSION = 1
+
+
+def report_key(exporter_class, state_key, players, player_name):
+    """Returns the hash of everything a report depends on: its format, the tournament
+    (see TournamentManager.state_key) and the names shown for its players"""
+    data = [REPORT_VERSION, exporter_class.__name__, state_key, [player_name(player) for player in players]]
+    return hashlib.sha256(json.dumps(data, default=str).encode()).hexdigest()
+
+
+def key_filepath(report_filepath):
+    report_filepath = Path(report_filepath)
+    return report_filepath.with_name(report_filepath.name + ".hash")
+
+
+def is_up_to_date(report_filepath, key):
+    """True if the report exists and was written for this key"""
+    try:
+        return Path(report_filepath).exists() and key_filepath(report_filepath).read_text() == key
+    except OSError:
+        return False
+
+
+def write_report(exporter, report_filepath, tournament, key):
+    """Writes the report, then its key next to it"""
+    # Without its key, a report left incomplete (if the program stops) is written again next time
+    key_filepath(report_filepath).unlink(missing_ok=True)
+    exporter.export_tournament(report_filepath, tournament)
+    key_filepath(report_filepath).write_text(key)
+    return report_filepath
@@ -0,0 +1,32 @@
+from .base import ReportExporter
+
+
+class TextExporter(ReportExporter):
+    """Plain text report"""
+
+    extension = "txt"
+
+    def chunks(self, info, standings, rounds):
+        yield f"Tournament report: {info['name']}\n"
+        yield f"Venue: {info['venue']}\n"
+        yield f"From: {info['from']}\n"
+        yield f"To: {info['to']}\n"
+        yield f"Number of rounds: {info['number_of_rounds']}\n"
+        yield f"Completed: {info['completed']}\n"
+        yield "\n"
+
+        yield "Standings:\n"
+        for idx, row in enumerate(standings, 1):
+            line = f"{idx}. {row['player_name']} - {row['points']} pts"
+            if row["tiebreaks"]:
+                values = ", ".join(f"{name}: {value}" for name, value in row["tiebreaks"].items())
+                line += f" ({values})"
+            yield line + "\n"
+        yield "\n"
+
+        yield "Rounds:"
+        for round_number, rnd in rounds:
+            yield f"\nRound {round_number}:"
+            for _, player_one, player_two, result, _ in self.match_rows(rnd):
+                yield f"\n- {player_one} vs {player_two} ({result})"
+            yield "\n"
@@ -0,0 +1,28 @@
+"""
+Imports players into a club from a CSV file (header: name,email,chess_id,birthday)
+or a JSON lines file (one player object per line).
+
+python import_players.py 1 players.csv
+python import_players.py 1 players.jsonl --rejects rejects.jsonl
+"""
+import argparse
+
+from models import ChessClub, PlayerManager
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import players into a club.")
+    parser.add_argument("club", type=int, help="club number (as listed in manage_players.py)")
+    parser.add_argument("file", type=str, help="CSV or JSON lines file")
+    parser.add_argument("--rejects", type=str, default=None, help="file for the rejected rows")
+
+    args = parser.parse_args()
+    manager = PlayerManager()
+    club = manager.get_club_by_number(args.club)
+    if club is None:
+        parser.error(f"no club number {args.club}")
+
+    try:
+        imported, rejected = manager.import_players(club, args.file, args.rejects)
+    finally:
+        ChessClub.flush_all()
+    print(f"{imported} players imported in {club.name}, {rejected} rows rejected.")
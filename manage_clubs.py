@@ -1,5 +1,6 @@
 from commands import ClubListCmd
-from screens import ClubCreate, ClubView, MainMenu, PlayerEdit, PlayerView
+from models import ChessClub
+from screens import ChessIdDuplicates, ClubCreate, ClubView, MainMenu, PlayerEdit, PlayerView
 
 
 class App:
@@ -12,6 +13,7 @@ class App:
         "player-view": PlayerView,
         "player-edit": PlayerEdit,
         "player-create": PlayerEdit,
+        "chess-id-duplicates": ChessIdDuplicates,
         "exit": False,
     }
 
@@ -37,4 +39,8 @@ class App:
 
 if __name__ == "__main__":
     app = App()
-    app.run()
+    try:
+        app.run()
+    finally:
+        # Changes saved in the background may still be pending
+        ChessClub.flush_all()
@@ -1,4 +1,4 @@
-from models import PlayerManager
+from models import ChessClub, PlayerManager
 
 def ask_non_empty(prompt):
     while True:
@@ -17,7 +17,7 @@ def ask_email(manager):
         print("Please provide a valid email address.")
 
 
-def ask_chess_id(manager, club):
+def ask_chess_id(manager):
     while True:
         value = input("Chess ID (XXNNNNN)? ")
         normalized = manager.normalize_chess_id(value)
@@ -25,8 +25,10 @@ def ask_chess_id(manager, club):
             print("Please provide a valid Chess ID (XXNNNNN).")
             continue
 
-        if manager.is_chess_id_taken(club, normalized):
-            print("A player with this Chess ID already exists in this club.")
+        owners = manager.chess_id_owners(normalized)
+        if owners:
+            owner_club, owner = owners[0]
+            print(f"This Chess ID is already taken by {owner.name} ({owner_club.name}).")
             continue
 
         return normalized
@@ -76,7 +78,7 @@ def create_player_flow():
         print(f"Create player in: {club.name}")
         name = ask_non_empty("Player name")
         email = ask_email(manager)
-        chess_id = ask_chess_id(manager, club)
+        chess_id = ask_chess_id(manager)
         birthday = ask_birthday(manager)
 
         player = manager.create_player(club, name, email, chess_id, birthday)
@@ -88,4 +90,8 @@ def create_player_flow():
 
 
 if __name__ == "__main__":
-    create_player_flow()
+    try:
+        create_player_flow()
+    finally:
+        # Changes saved in the background may still be pending
+        ChessClub.flush_all()
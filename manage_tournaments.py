@@ -3,7 +3,10 @@ from views import TournamentView
 
 def pick_tournament(controller, view, include_completed=None):
     entries = controller.list_tournaments(include_completed=include_completed)
-    return view.choose_tournament(entries)
+    filepath = view.choose_tournament(entries)
+    if filepath is None:
+        return None
+    return controller.load_tournament(filepath)
 
 def main():
     controller = TournamentController()
@@ -19,8 +22,13 @@ def main():
         if choice == "1":
             while True:
                 player_name = view.ask_player_name()
-                player = controller.get_player_by_name(player_name)
-                view.show_player(player)
+                players = controller.get_players_by_name(player_name)
+                if players:
+                    view.show_players(players)
+                else:
+                    player = view.choose_player(controller.search_players(player_name))
+                    if player is not None:
+                        view.show_player(player)
                 if view.ask_main_menu_or_exit() == "exit":
                     view.show_message("Bye!")
                     return
@@ -61,8 +69,12 @@ def main():
                 if not tournament:
                     view.show_message("No tournament found.")
                 else:
-                    filepath = controller.export_report(tournament)
-                    view.show_report_written(filepath)
+                    report_format = view.ask_report_format(controller.REPORT_FORMATS)
+                    if report_format is None:
+                        view.show_message("Unknown report format.")
+                    else:
+                        result = controller.export_report(tournament, report_format)
+                        view.show_report_written(result["filepath"], result["written"])
                 if view.ask_main_menu_or_exit() == "exit":
                     view.show_message("Bye!")
                     return
@@ -134,6 +146,7 @@ def main():
                 end_date_text = view.ask_tournament_end_date()
                 number_of_rounds = view.ask_number_of_rounds()
                 player_names = view.ask_tournament_player_names()
+                pairing = view.ask_pairing_strategy()
 
                 result = controller.create_tournament(
                     name=name,
@@ -142,6 +155,7 @@ def main():
                     end_date_text=end_date_text,
                     number_of_rounds=number_of_rounds,
                     player_names=player_names,
+                    pairing=pairing,
                 )
                 if not result["ok"]:
                     view.show_message(result["message"])
@@ -154,6 +168,49 @@ def main():
                 break
             continue
 
+        if choice == "8":
+            while True:
+                tournament = pick_tournament(controller, view, include_completed=False)
+                if not tournament:
+                    view.show_message("No in-progress tournament found.")
+                else:
+                    round_number = view.ask_round_number()
+                    round_results = view.ask_round_results()
+                    if round_number is None or round_results is None:
+                        view.show_message("Invalid round number or results.")
+                    else:
+                        result = controller.set_match_results(
+                            tournament=tournament,
+                            results=[(round_number, match_number, winner) for match_number, winner in round_results],
+                        )
+                        if not result["ok"]:
+                            view.show_message(result["message"])
+                        else:
+                            view.show_message(f"{len(result['matches'])} match results saved.")
+                if view.ask_main_menu_or_exit() == "exit":
+                    view.show_message("Bye!")
+                    return
+                break
+            continue
+
+        if choice == "9":
+            criteria = view.ask_tournament_search()
+            if criteria is None:
+                view.show_message("Invalid year.")
+            else:
+                view.show_tournaments(controller.find_tournaments(**criteria))
+            if view.ask_main_menu_or_exit() == "exit":
+                view.show_message("Bye!")
+                return
+            continue
+
+        if choice == "r":
+            view.show_ratings(controller.get_ratings())
+            if view.ask_main_menu_or_exit() == "exit":
+                view.show_message("Bye!")
+                return
+            continue
+
         view.show_message("Invalid choice.")
 
 
@@ -0,0 +1,24 @@
+"""
+Migrates the clubs and tournaments between the JSON files and a SQLite database.
+
+python migrate_storage.py to-sqlite data/chess.sqlite3
+python migrate_storage.py to-json data/chess.sqlite3
+"""
+import argparse
+
+from models import ClubManager, TournamentManager
+from models.sqlite_storage import migrate_to_json, migrate_to_sqlite
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate data between JSON files and a SQLite database.")
+    parser.add_argument("direction", choices=["to-sqlite", "to-json"], help="migration direction")
+    parser.add_argument("database", type=str, help="SQLite database file")
+    parser.add_argument("--clubs", type=str, default="data/clubs", help="clubs folder")
+    parser.add_argument("--tournaments", type=str, default="data/tournaments", help="tournaments folder")
+
+    args = parser.parse_args()
+    if args.direction == "to-sqlite":
+        migrate_to_sqlite(args.database, ClubManager(args.clubs), TournamentManager(args.tournaments))
+    else:
+        migrate_to_json(args.database, clubs_folder=args.clubs, tournaments_folder=args.tournaments)
+    print("Done.")
@@ -1,19 +1,32 @@
 from .club import ChessClub
 from .club_manager import ClubManager
 from .match import Match
+from .pairing import PAIRING_STRATEGIES, GreedyPairing, SwissPairing
 from .player import Player
 from .player_manager import PlayerManager
+from .ratings import RatingEngine
 from .round import Round
+from .storage import get_club_manager, make_club_manager, make_tournament_manager
+from .tiebreaks import DEFAULT_TIEBREAKS, TIEBREAKS
 from .tournament import Tournament
 from .tournament_manager import TournamentManager
 
 __all__ = [
     "Player",
     "PlayerManager",
+    "RatingEngine",
     "ChessClub",
     "ClubManager",
     "Match",
+    "PAIRING_STRATEGIES",
+    "GreedyPairing",
+    "SwissPairing",
     "Round",
+    "TIEBREAKS",
+    "DEFAULT_TIEBREAKS",
     "Tournament",
     "TournamentManager",
+    "get_club_manager",
+    "make_club_manager",
+    "make_tournament_manager",
 ]
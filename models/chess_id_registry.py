@@ -0,0 +1,44 @@
+class ChessIdRegistry:
+    """
+    Chess ID -> (club, player) for the players of all clubs.
+
+    A chess ID identifies one player of the federation: the registry is used to refuse a chess ID
+    already taken in any club. Duplicates created before (in the club files) are kept, so that
+    they can be reported (see duplicates).
+    """
+
+    def __init__(self):
+        # Chess ID -> list of (club, player)
+        self._owners = {}
+
+    def add(self, club, player):
+        self._owners.setdefault(player.chess_id, []).append((club, player))
+
+    def remove(self, player, chess_id=None):
+        """Removes a player. chess_id is the registered value, if it changed since it was added."""
+        chess_id = chess_id or player.chess_id
+        owners = self._owners.get(chess_id, [])
+        for i, (_, owner) in enumerate(owners):
+            # Players are compared by identity: their attributes may have changed already
+            if owner is player:
+                del owners[i]
+                break
+        if not owners:
+            self._owners.pop(chess_id, None)
+
+    def owners(self, chess_id):
+        """Returns the list of (club, player) with this chess ID"""
+        return self._owners.get(chess_id, [])[:]
+
+    def is_taken(self, chess_id, player=None):
+        """True if the chess ID belongs to a player (other than player, when editing one)"""
+        return any(owner is not player for _, owner in self._owners.get(chess_id, ()))
+
+    def names(self):
+        """Returns chess ID -> player name, for the chess IDs of a single player"""
+        return {chess_id: owners[0][1].name for chess_id, owners in self._owners.items() if len(owners) == 1}
+
+    def duplicates(self):
+        """Returns the chess IDs given to several players (in different clubs, or in the same one),
+        sorted, with their list of (club, player)"""
+        return {chess_id: owners[:] for chess_id, owners in sorted(self._owners.items()) if len(owners) > 1}
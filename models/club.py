@@ -1,5 +1,11 @@
+import atexit
 import json
+import threading
+import weakref
+from contextlib import contextmanager
+from operator import itemgetter
 
+from .journal import Journal, file_key
 from .player import Player
 
 
@@ -7,10 +13,16 @@ class ChessClub:
     """
     A local chess club.
 
-    Data is loaded from a JSON file (provided as argument).
+    Data is loaded from a JSON file (provided as argument), and the changes saved in its journal.
     The class creates Player instances based on JSON data.
+
+    Saves can be deferred: grouped with batch(), or written in the background after a delay
+    with set_write_behind(). flush() (or ChessClub.flush_all()) writes the pending changes.
     """
 
+    # Clubs with changes not written yet
+    _unsaved = weakref.WeakSet()
+
     def __init__(self, filepath=None, name=None):
         """The constructor works in two ways:
         - if the filepath is provided, it loads data from JSON
@@ -20,44 +32,187 @@ class ChessClub:
         self.name = name
         self.filepath = filepath
         self.players = []
+        # Callables notified when a player is created or updated (see add_listener)
+        self._listeners = []
+        # Changes not saved yet, appended to the journal on save
+        self._changes = []
+        self._journal = None
+        # A new club is fully written on its first save
+        self._snapshot_needed = True
+        # State of the files when they were last read or written (see journal.file_key)
+        self.file_key = None
+        # Deferred saves (see batch and set_write_behind)
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._write_behind_delay = None
+        self._timer = None
 
         if filepath and not name:
             # Load data from the JSON file
             with open(filepath) as fp:
                 data = json.load(fp)
                 self.name = data["name"]
-                self.players = [
-                    Player(**player_dict) for player_dict in data["players"]
-                ]
+                self.players = Player.from_rows(map(itemgetter(*Player.FIELDS), data["players"]))
+
+            # Then replay the changes saved since the file was written
+            for change in self.journal.read(after_seq=data.get("journal_seq", 0)):
+                self._apply_change(change)
+            self._snapshot_needed = False
+            self.file_key = file_key(filepath)
         elif not filepath:
             # We did not have a file, so we are going to create it by running the save method
             self.save()
 
+    @property
+    def journal(self):
+        if self._journal is None:
+            self._journal = Journal(self.filepath)
+        return self._journal
+
+    def serialize(self):
+        return {"name": self.name, "players": [p.serialize() for p in self.players]}
+
+    def __getstate__(self):
+        # Locks and timers cannot be pickled (clubs are sent back by the loader processes)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_timer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
     def save(self):
-        """Serializes the players and saves the club info to the JSON file"""
+        """Saves the club, unless saves are deferred (in a batch, or with write-behind)"""
+
+        with self._lock:
+            if self._batch_depth:
+                ChessClub._unsaved.add(self)
+                return
+
+            if self._write_behind_delay is not None:
+                ChessClub._unsaved.add(self)
+                if self._timer is None:
+                    # Every change made until the timer runs is written at once
+                    self._timer = threading.Timer(self._write_behind_delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
 
-        with open(self.filepath, "w") as fp:
-            json.dump(
-                {"name": self.name, "players": [p.serialize() for p in self.players]},
-                fp,
-            )
+            self.flush()
+
+    def flush(self):
+        """Writes the pending changes now"""
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._changes or self._snapshot_needed:
+                self._write()
+            ChessClub._unsaved.discard(self)
+
+    def _write(self):
+        """Saves the changes to the journal, or the whole club info to the JSON file (see Journal.save)"""
+
+        self.journal.save(self.serialize, self._changes, snapshot=self._snapshot_needed)
+        self._changes = []
+        self._snapshot_needed = False
+        self.file_key = file_key(self.filepath)
+
+    @contextmanager
+    def batch(self):
+        """Context manager: the changes made inside the block are saved once, at the end"""
+
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.save()
+
+    def set_write_behind(self, delay):
+        """Writes the changes in the background, delay seconds after the first unsaved one.
+
+        delay=None writes every change immediately again.
+        """
+
+        with self._lock:
+            self._write_behind_delay = delay
+            if delay is None:
+                self.flush()
+
+    @classmethod
+    def flush_all(cls):
+        """Writes the pending changes of every club (to call before the program exits)"""
+
+        for club in list(cls._unsaved):
+            club.flush()
+
+    def _apply_change(self, change):
+        if change["op"] == "create":
+            self.players.append(Player(**change["player"]))
+        elif change["op"] == "update":
+            player = self.players[change["index"]]
+            for key, value in change["player"].items():
+                setattr(player, key, value)
+
+    def add_listener(self, listener):
+        """Registers a callable called as listener(club, player, previous) after each player change.
+
+        previous is None for a new player, or a dict with the previous name and chess_id.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, player, previous):
+        for listener in self._listeners:
+            listener(self, player, previous)
 
     def create_player(self, **kwargs):
         """Utility method to create a new player instance and add it to the club"""
 
         player = Player(**kwargs)
-        self.players.append(player)
-        self.save()
+        with self._lock:
+            self.players.append(player)
+            self._changes.append({"op": "create", "player": player.serialize()})
+            self.save()
+        self._notify(player, None)
         return player
 
+    def create_players(self, rows):
+        """Creates the players of a list of dicts (Player arguments) at once, with a single save"""
+
+        players = [Player(**kwargs) for kwargs in rows]
+        with self._lock:
+            self.players.extend(players)
+            self._changes.extend({"op": "create", "player": player.serialize()} for player in players)
+            self.save()
+        for player in players:
+            self._notify(player, None)
+        return players
+
     def update_player(self, player, **kwargs):
         """Utility method to update a player instance based on arguments provided"""
 
-        if player not in self.players:
+        # Players are compared by identity: another player of the club may have the same attributes
+        index = next((i for i, club_player in enumerate(self.players) if club_player is player), None)
+        if index is None:
             raise RuntimeError(f"Player {player} not in club {self.name}!")
 
-        for key, value in kwargs.items():
-            setattr(player, key, value)
+        previous = {"name": player.name, "chess_id": player.chess_id}
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(player, key, value)
 
-        self.save()
+            self._changes.append({"op": "update", "index": index, "player": player.serialize()})
+            self.save()
+        self._notify(player, previous)
         return player
+
+
+# Background saves must not be lost when the program exits
+atexit.register(ChessClub.flush_all)
@@ -1,25 +1,243 @@
 import json
 from pathlib import Path
 
+from .chess_id_registry import ChessIdRegistry
 from .club import ChessClub
+from .club_snapshot import ClubSnapshot, SnapshotChessClub, write_snapshot
+from .journal import file_key
+from .loader import load_files
+from .player_search import PlayerSearchIndex, normalize_name
+
+
+def load_club(filepath):
+    """Loads a club file, returns None if the file is not valid JSON (runs in the loader processes)"""
+    try:
+        return ChessClub(filepath)
+    except json.JSONDecodeError:
+        return None
 
 
 class ClubManager:
-    def __init__(self, data_folder="data/clubs"):
+    SNAPSHOT_FILENAME = ".snapshot"
+
+    def __init__(self, data_folder="data/clubs", workers=None, write_behind=None, snapshot=False):
         datadir = Path(data_folder)
         self.data_folder = datadir
+        # Number of processes used to load the club files (see loader.load_files)
+        self.workers = workers
+        # Delay (seconds) before the club changes are written, None to write them immediately
+        self.write_behind = write_behind
+        # Start from the binary snapshot of the folder (see club_snapshot), kept up to date with the files
+        self.snapshot = snapshot
         self.clubs = []
-        for filepath in datadir.iterdir():
-            if filepath.is_file() and filepath.suffix == ".json":
-                try:
-                    self.clubs.append(ChessClub(filepath))
-                except json.JSONDecodeError:
-                    print(filepath, "is invalid JSON file.")
+        # Lookup indexes over the players of all clubs: chess ID -> (club, player), normalized name -> players
+        # (only built on the first lookup, see _build_indexes)
+        self._registry = None
+        self._by_name = None
+        # Fuzzy search index, only built on the first search
+        self._search_index = None
+        self._load_clubs()
+
+    def _club_filepaths(self):
+        return [
+            filepath
+            for filepath in self.data_folder.iterdir()
+            if filepath.is_file() and filepath.suffix == ".json"
+        ]
+
+    def _read_clubs(self, filepaths):
+        """Yields (filepath, club) for the valid club files"""
+        # Results come back in directory order
+        for filepath, club in zip(filepaths, load_files(load_club, filepaths, workers=self.workers)):
+            if club is None:
+                print(filepath, "is invalid JSON file.")
+            else:
+                yield filepath, club
+
+    def _load_clubs(self):
+        filepaths = self._club_filepaths()
+        if self.snapshot:
+            self._load_snapshot(filepaths)
+            return
+
+        for _, club in self._read_clubs(filepaths):
+            self._add_club(club)
+
+    def _load_snapshot(self, filepaths):
+        snapshot_filepath = self.data_folder / self.SNAPSHOT_FILENAME
+        snapshot = ClubSnapshot.open(snapshot_filepath)
+        rows = dict(snapshot.clubs()) if snapshot else {}
+
+        # A club is read from the snapshot while its file and journal are unchanged
+        keys = {filepath: file_key(filepath) for filepath in filepaths}
+        clubs = {}
+        for filepath in filepaths:
+            if filepath.name in rows and snapshot.sources.get(filepath.name) == keys[filepath]:
+                clubs[filepath] = SnapshotChessClub(snapshot, filepath, keys[filepath], rows[filepath.name])
+        to_read = [filepath for filepath in filepaths if filepath not in clubs]
+        clubs.update(self._read_clubs(to_read))
+
+        for filepath in filepaths:
+            if filepath in clubs:
+                self._add_club(clubs[filepath])
+
+        if to_read or rows.keys() != {filepath.name for filepath in filepaths}:
+            try:
+                write_snapshot(
+                    snapshot_filepath,
+                    [(filepath.name, keys[filepath], clubs[filepath]) for filepath in filepaths if filepath in clubs],
+                )
+            except OSError:
+                # The snapshot is only a cache
+                pass
+
+    def refresh(self):
+        """Reloads the club files changed (by another program) since they were read, and loads the new files.
+
+        Clubs with changes not saved yet are kept as they are. The clubs and players reloaded are updated
+        in place, so the instances held by the program stay the manager's.
+        """
+        clubs_by_filepath = {Path(club.filepath): club for club in self.clubs}
+        filepaths = self._club_filepaths()
+        to_read = []
+        for filepath in filepaths:
+            club = clubs_by_filepath.get(filepath)
+            if club is None or (not club._changes and file_key(filepath) != club.file_key):
+                to_read.append(filepath)
+
+        for filepath, club in self._read_clubs(to_read):
+            previous = clubs_by_filepath.get(filepath)
+            if previous is None:
+                self._add_club(club)
+            else:
+                self._reload_club(previous, club)
+
+        # Files deleted since they were read
+        for filepath in clubs_by_filepath.keys() - set(filepaths):
+            club = clubs_by_filepath[filepath]
+            if not club._changes:
+                self._remove_club(club)
+
+    def _unindex_club(self, club):
+        if self._registry is not None:
+            for player in club.players:
+                self._registry.remove(player)
+                self._unindex(self._by_name, normalize_name(player.name), player)
+        # Rebuilt on the next search
+        self._search_index = None
+
+    def _remove_club(self, club):
+        """Removes a club (and its players from the indexes)"""
+        self._unindex_club(club)
+        self.clubs.remove(club)
+
+    def _reload_club(self, club, loaded):
+        """Updates club (and its players, by position) with the content of loaded, the club read again from its file"""
+        self._unindex_club(club)
+        players = club.players
+        for position, loaded_player in enumerate(loaded.players):
+            if position < len(players):
+                player = players[position]
+                for key, value in loaded_player.serialize().items():
+                    if getattr(player, key) != value:
+                        setattr(player, key, value)
+            else:
+                players.append(loaded_player)
+        del players[len(loaded.players):]
+
+        club.name = loaded.name
+        # Position of the journal, and state of the files read
+        club._journal = loaded.journal
+        club.file_key = loaded.file_key
+        if self._registry is not None:
+            for player in players:
+                self._index_player(club, player)
+
+    def _add_club(self, club):
+        self.clubs.append(club)
+        if self.write_behind is not None:
+            club.set_write_behind(self.write_behind)
+        if self._registry is not None:
+            for player in club.players:
+                self._index_player(club, player)
+        club.add_listener(self._on_player_change)
+
+    def _build_indexes(self):
+        if self._registry is None:
+            self._registry = ChessIdRegistry()
+            self._by_name = {}
+            for club in self.clubs:
+                for player in club.players:
+                    self._index_player(club, player)
+
+    def _index_player(self, club, player):
+        self._registry.add(club, player)
+        self._by_name.setdefault(normalize_name(player.name), []).append(player)
+
+    def _unindex(self, index, key, player):
+        players = index.get(key, [])
+        for i, indexed_player in enumerate(players):
+            # Players are compared by identity: their attributes may have changed already
+            if indexed_player is player:
+                del players[i]
+                break
+        if not players:
+            index.pop(key, None)
+
+    def _on_player_change(self, club, player, previous):
+        if self._registry is not None:
+            if previous is not None:
+                self._registry.remove(player, chess_id=previous["chess_id"])
+                self._unindex(self._by_name, normalize_name(previous["name"]), player)
+            self._index_player(club, player)
+
+        if self._search_index is not None:
+            if previous is not None:
+                self._search_index.remove(player, chess_id=previous["chess_id"])
+            self._search_index.add(player)
+
+    def find_by_chess_id(self, chess_id):
+        """Returns the list of players (from all clubs) with this chess ID"""
+        return [player for _, player in self.chess_id_owners(chess_id)]
+
+    def chess_id_owners(self, chess_id):
+        """Returns the list of (club, player) with this chess ID (more than one is a duplicate)"""
+        self._build_indexes()
+        return self._registry.owners(chess_id)
+
+    def is_chess_id_taken(self, chess_id, player=None):
+        """True if a player of any club (other than player, when editing one) has this chess ID"""
+        self._build_indexes()
+        return self._registry.is_taken(chess_id, player)
+
+    def chess_id_duplicates(self):
+        """Returns the chess IDs given to several players, with their list of (club, player)"""
+        self._build_indexes()
+        return self._registry.duplicates()
+
+    def player_names(self):
+        """Returns chess ID -> player name, for the chess IDs that are not duplicates
+        (a read-only index, to show names instead of chess IDs)"""
+        self._build_indexes()
+        return self._registry.names()
+
+    def find_by_name(self, name):
+        """Returns the list of players (from all clubs) with this name, ignoring case and spaces"""
+        self._build_indexes()
+        return self._by_name.get(normalize_name(name), [])[:]
+
+    def search_players(self, query, limit=10):
+        """Returns the players (from all clubs) best matching a partial or misspelled name, or a chess ID prefix"""
+        if self._search_index is None:
+            self._search_index = PlayerSearchIndex(
+                player for club in self.clubs for player in club.players
+            )
+        return self._search_index.search(query, limit=limit)
 
     def create(self, name):
         filepath = self.data_folder / (name.replace(" ", "") + ".json")
         club = ChessClub(name=name, filepath=filepath)
         club.save()
 
-        self.clubs.append(club)
+        self._add_club(club)
         return club
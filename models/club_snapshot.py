@@ -0,0 +1,175 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+from .club import ChessClub
+from .player import Player
+
+MAGIC = b"CHESSNAP"
+VERSION = 2
+# Magic, version, then the sizes of: sources (JSON), club table, player table, string offsets, string data
+HEADER = struct.Struct("<8sIIIIII")
+# Per club: filename, name (string numbers), first player, number of players, journal last_seq and count
+CLUB_COLUMNS = 6
+# Per player: name, email, chess_id, birthday (string numbers)
+PLAYER_COLUMNS = 4
+
+
+class StringTable:
+    """Strings stored once each (birthdays repeat a lot), referenced by number"""
+
+    def __init__(self):
+        self.numbers = {}
+
+    def add(self, value):
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.numbers)
+        return number
+
+    def encode(self):
+        """Returns the offsets of the strings in the data (one more than the number of strings: string n
+        is data[offsets[n]:offsets[n + 1]]), and the data (UTF-8)"""
+        encoded = [value.encode() for value in self.numbers]
+        offsets = array("I", [0])
+        offsets.extend(accumulate(map(len, encoded)))
+        return offsets, b"".join(encoded)
+
+
+def write_snapshot(filepath, clubs):
+    """Writes the snapshot of clubs, a list of (filename, file key, club) (see journal.file_key)"""
+    strings = StringTable()
+    club_table = array("I")
+    player_table = array("I")
+    for filename, _, club in clubs:
+        club_table.extend(
+            [
+                strings.add(filename),
+                strings.add(club.name),
+                len(player_table) // PLAYER_COLUMNS,
+                len(club.players),
+                club.journal.last_seq,
+                club.journal.count,
+            ]
+        )
+        for player in club.players:
+            player_table.extend(strings.add(value) for value in player.serialize().values())
+
+    offsets, data = strings.encode()
+    sources = json.dumps({filename: key for filename, key, _ in clubs}).encode()
+    # The tables are aligned on 4 bytes, so that they can be read in place from the mapped file
+    sources += b" " * (-len(sources) % 4)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(sources),
+        len(club_table) * 4,
+        len(player_table) * 4,
+        len(offsets) * 4,
+        len(data),
+    )
+
+    filepath = Path(filepath)
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "wb") as fp:
+        fp.write(header)
+        fp.write(sources)
+        for table in (club_table, player_table, offsets):
+            table.tofile(fp)
+        fp.write(data)
+    os.replace(tmp_filepath, filepath)
+
+
+class ClubSnapshot:
+    """
+    Binary snapshot of the club files of a folder, read in place from a memory-mapped file.
+
+    The players are stored in columns of string numbers, and the strings once each in a table
+    (each string decoded on first use, from its offset): a club is only turned into Player instances
+    when its players are used (see SnapshotChessClub).
+    The snapshot is a local cache (in the native byte order): it is rebuilt from the JSON files
+    when they change.
+    """
+
+    def __init__(self, filepath):
+        with open(filepath, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        magic, version, *sizes = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION or HEADER.size + sum(sizes) != len(view):
+            raise ValueError(f"{filepath} is not a club snapshot")
+
+        sources_size, club_size, player_size, offsets_size, _ = sizes
+        position = HEADER.size
+        self.sources = json.loads(bytes(view[position:position + sources_size]))
+        position += sources_size
+        self._clubs = view[position:position + club_size].cast("I")
+        position += club_size
+        self._players = view[position:position + player_size].cast("I")
+        position += player_size
+        self._offsets = view[position:position + offsets_size].cast("I")
+        position += offsets_size
+        self._data = view[position:]
+        # String number -> string, for the strings decoded so far
+        self._strings = {}
+
+    @classmethod
+    def open(cls, filepath):
+        """Returns the snapshot stored in filepath, or None if there is no valid snapshot"""
+        try:
+            return cls(filepath)
+        except (OSError, ValueError):
+            return None
+
+    def string(self, number):
+        value = self._strings.get(number)
+        if value is None:
+            value = self._strings[number] = str(self._data[self._offsets[number]:self._offsets[number + 1]], "utf-8")
+        return value
+
+    def clubs(self):
+        """Yields (filename, club row) for each club of the snapshot (its players are not read yet)"""
+        string = self.string
+        for row in range(0, len(self._clubs), CLUB_COLUMNS):
+            filename, name, first, count, last_seq, journal_count = self._clubs[row:row + CLUB_COLUMNS]
+            yield string(filename), (string(name), first, count, last_seq, journal_count)
+
+    def players(self, first, count):
+        string = self.string
+        numbers = self._players[first * PLAYER_COLUMNS:(first + count) * PLAYER_COLUMNS]
+        values = iter([string(number) for number in numbers])
+        # Rows of PLAYER_COLUMNS values
+        return Player.from_rows(zip(*[values] * PLAYER_COLUMNS))
+
+
+class SnapshotChessClub(ChessClub):
+    """A club read from the snapshot. Its players are only created when they are used;
+    changes are saved to the club file and its journal, like any club."""
+
+    def __init__(self, snapshot, filepath, file_key, row):
+        name, first, count, last_seq, journal_count = row
+        # With both a filepath and a name, ChessClub neither loads nor saves anything
+        super().__init__(filepath=filepath, name=name)
+        self._snapshot = snapshot
+        self._player_range = (first, count)
+        self._players = None
+        self._snapshot_needed = False
+        self.file_key = file_key
+        # The journal is not read: its position is stored in the snapshot
+        self.journal.last_seq = last_seq
+        self.journal.count = journal_count
+
+    @property
+    def players(self):
+        if self._players is None:
+            self._players = self._snapshot.players(*self._player_range)
+        return self._players
+
+    @players.setter
+    def players(self, value):
+        self._players = value
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def write_snapshot(filepath, data):
+    """Writes the JSON data (or its JSON text, already encoded) to a temporary file, then replaces the file with it.
+
+    If the program stops while writing, the previous file is left untouched.
+    """
+    filepath = Path(filepath)
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "w") as fp:
+        # json.dumps uses the C encoder, json.dump (to a file) does not
+        fp.write(data if isinstance(data, str) else json.dumps(data))
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp_filepath, filepath)
+
+
+def file_key(snapshot_filepath):
+    """Modification times and sizes of a JSON file and its journal: changes when either file is written"""
+    snapshot_filepath = Path(snapshot_filepath)
+    key = []
+    for path in (snapshot_filepath, snapshot_filepath.with_suffix(".journal")):
+        try:
+            stat = path.stat()
+            key.extend([stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            key.extend([None, None])
+    return key
+
+
+class Journal:
+    """
+    Append-only log of the changes made to a JSON file (the snapshot) since it was last written.
+
+    Each change is a JSON line with a sequence number ("seq"). The snapshot stores the sequence
+    number of the last change it contains ("journal_seq"), so changes are never applied twice,
+    even if the program stops between writing the snapshot and deleting the journal.
+    """
+
+    # Number of changes after which the snapshot is rewritten and the journal deleted
+    MAX_ENTRIES = 100
+
+    def __init__(self, snapshot_filepath):
+        self.snapshot_filepath = Path(snapshot_filepath)
+        self.filepath = self.snapshot_filepath.with_suffix(".journal")
+        self.last_seq = 0
+        self.count = 0
+        # Held by the writers (append and compact)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled (journals are sent back with the clubs by the loader processes)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def read(self, after_seq=0):
+        """Returns the changes more recent than the snapshot (after_seq is its journal_seq)"""
+        self.last_seq = after_seq
+        self.count = 0
+        if not self.filepath.exists():
+            return []
+
+        changes = []
+        # The last line is empty, or not fully written: the change was never saved, it is ignored
+        # (and removed by the next append)
+        for line in self.filepath.read_bytes().split(b"\n")[:-1]:
+            change = json.loads(line)
+            self.count += 1
+            if change["seq"] > after_seq:
+                changes.append(change)
+                self.last_seq = change["seq"]
+        return changes
+
+    def needs_compaction(self, pending=0):
+        return self.count + pending > self.MAX_ENTRIES
+
+    def append(self, changes):
+        with self._lock, open(self.filepath, "a+b") as fp:
+            size = fp.seek(0, os.SEEK_END)
+            if size:
+                fp.seek(size - 1)
+                if fp.read(1) != b"\n":
+                    # Last line not fully written (see read): removed before adding new lines
+                    fp.seek(0)
+                    fp.truncate(fp.read().rfind(b"\n") + 1)
+            for change in changes:
+                self.last_seq += 1
+                fp.write(json.dumps({"seq": self.last_seq, **change}).encode() + b"\n")
+            fp.flush()
+            os.fsync(fp.fileno())
+        self.count += len(changes)
+
+    def compact(self, data, pending=0):
+        """Writes the snapshot (data, or the JSON text of an object) including the pending changes,
+        then deletes the journal"""
+        with self._lock:
+            self.last_seq += pending
+            if isinstance(data, str):
+                # Added last, as json.dumps would
+                data = f'{data[:-1]}, "journal_seq": {self.last_seq}}}'
+            else:
+                data = {**data, "journal_seq": self.last_seq}
+            write_snapshot(self.snapshot_filepath, data)
+            self.filepath.unlink(missing_ok=True)
+            self.count = 0
+
+    def save(self, serialize, changes, snapshot=False):
+        """Saves the changes: appended to the journal, or in a new snapshot (serialize() returns its data,
+        or its JSON text).
+
+        The snapshot is written when it does not exist yet, when requested, or when the journal is too long.
+        """
+        if snapshot or not self.snapshot_filepath.exists() or self.needs_compaction(len(changes)):
+            self.compact(serialize(), pending=len(changes))
+        elif changes:
+            self.append(changes)
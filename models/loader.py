@@ -0,0 +1,31 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Number of processes used to load data files (default: number of CPUs)
+WORKERS_ENV = "CHESS_LOAD_WORKERS"
+# Below this number of files, starting the processes costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+
+def default_workers():
+    value = os.environ.get(WORKERS_ENV, "")
+    if value.isdigit():
+        return int(value)
+    return os.cpu_count() or 1
+
+
+def load_files(function, filepaths, workers=None):
+    """Calls function(filepath) for each file and returns the results in the same order.
+
+    JSON decoding and model construction are CPU-bound: the files are loaded by a pool of processes
+    when there are enough of them. function must be defined at module level (it is pickled).
+    """
+    if workers is None:
+        workers = default_workers()
+
+    if workers <= 1 or len(filepaths) < PARALLEL_MIN_FILES:
+        return [function(filepath) for filepath in filepaths]
+
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, filepaths, chunksize=chunksize))
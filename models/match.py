@@ -1,6 +1,9 @@
 class Match:
     # MATHCES BETWEEN TWO TOURNAMENT IDS
 
+    # No __dict__ per match: archives can hold hundreds of thousands of them
+    __slots__ = ("player_one_id", "player_two_id", "completed", "winner")
+
     def __init__(self, player_one_id, player_two_id, completed=False, winner=None):
         self.player_one_id = player_one_id
         self.player_two_id = player_two_id
@@ -11,6 +14,9 @@ class Match:
     def players(self):
         return [self.player_one_id, self.player_two_id]
 
+    def has_player(self, player_id):
+        return player_id == self.player_one_id or player_id == self.player_two_id
+
     def set_result(self, winner=None):
         #SETS THE MATCH RESULT. WINNER CAN BE player_one_id, player_two_id, or none to tie
 
@@ -0,0 +1,125 @@
+import random
+from abc import ABCMeta, abstractmethod
+
+
+class PairingStrategy(metaclass=ABCMeta):
+    """Base class for the strategies used to pair players for the next round"""
+
+    @abstractmethod
+    def pair(self, ranking, has_played):
+        """Child classes must implement this method.
+
+        ranking is a list of (player, points) tuples, best player first.
+        has_played(player_one, player_two) tells if two players already met.
+        It must return a list of (player_one, player_two) tuples.
+        """
+        pass
+
+
+class GreedyPairing(PairingStrategy):
+    """Pairs each player, in ranking order, with a random opponent they did not meet yet.
+
+    If no such opponent is left, the next player in the list is used (rematch).
+    """
+
+    def pair(self, ranking, has_played):
+        waiting = [name for name, _ in ranking]
+        pairs = []
+
+        while len(waiting) > 0:
+            p1 = waiting.pop(0)
+            candidate_indexes = []
+
+            i = 0
+            while i < len(waiting):
+                if not has_played(p1, waiting[i]):
+                    candidate_indexes.append(i)
+                i += 1
+
+            if candidate_indexes:
+                chosen_index = random.choice(candidate_indexes)
+            else:
+                chosen_index = 0
+
+            p2 = waiting.pop(chosen_index)
+            pairs.append((p1, p2))
+
+        return pairs
+
+
+class SwissPairing(PairingStrategy):
+    """Swiss system pairing with score brackets and backtracking.
+
+    Players are grouped by points (players with the same points are shuffled),
+    then each player is paired with the closest player below them they did not meet yet:
+    first in their own bracket, then floating down to the next brackets.
+    When a player cannot be paired, the previous pairs are undone until a solution is found,
+    so there is no rematch as long as a legal pairing exists.
+    """
+
+    # Number of dead ends allowed before giving up the search
+    MAX_BACKTRACKS = 100000
+
+    def pair(self, ranking, has_played):
+        order = []
+        for bracket in self._brackets(ranking):
+            random.shuffle(bracket)
+            order.extend(bracket)
+
+        pairs = self._search(order, has_played)
+        if pairs is None:
+            # No pairing without rematch (or the search took too long)
+            return GreedyPairing().pair([(name, 0) for name in order], has_played)
+        return pairs
+
+    def _brackets(self, ranking):
+        brackets = []
+        previous_points = None
+        for name, points in ranking:
+            if not brackets or points != previous_points:
+                brackets.append([])
+                previous_points = points
+            brackets[-1].append(name)
+        return brackets
+
+    def _search(self, order, has_played):
+        count = len(order)
+        paired = [False] * count
+        # Chosen pairs, as indexes in order
+        stack = []
+        backtracks = 0
+
+        i = 0
+        resume = None
+        while True:
+            while i < count and paired[i]:
+                i += 1
+            if i == count:
+                return [(order[a], order[b]) for a, b in stack]
+
+            # Look for the closest opponent (after the last one tried when backtracking)
+            j = i + 1 if resume is None else resume + 1
+            resume = None
+            while j < count and (paired[j] or has_played(order[i], order[j])):
+                j += 1
+
+            if j < count:
+                paired[i] = True
+                paired[j] = True
+                stack.append((i, j))
+                i += 1
+                continue
+
+            # Dead end: undo the last pair and try its next opponent
+            backtracks += 1
+            if not stack or backtracks > self.MAX_BACKTRACKS:
+                return None
+            i, resume = stack.pop()
+            paired[i] = False
+            paired[resume] = False
+
+
+PAIRING_STRATEGIES = {
+    "swiss": SwissPairing,
+    "greedy": GreedyPairing,
+}
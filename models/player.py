@@ -1,58 +1,166 @@
+import gc
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def parse_date(value, date_format):
+    """Parses a date (cached: the same birthdays come up in large clubs)"""
+    return datetime.strptime(value, date_format)
+
+
+@contextmanager
+def gc_paused():
+    """Context manager pausing the garbage collector while many players are created.
+
+    Each collection would walk all the players created so far, while none of them is garbage. The pause
+    applies to the whole process (other threads included): only wrap loops creating objects that are kept.
+    Blocks can be nested, collection is enabled again at the end of the outermost one.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 
 class Player:
     """The player class holds all information related to a player"""
 
     DATE_FORMAT = "%d-%m-%Y"
+    FIELDS = ("name", "email", "chess_id", "birthday")
+
+    # No __dict__ per instance: clubs can have many players
+    __slots__ = ("_name", "_email", "_chess_id", "_birthday", "_birthdate", "_hash")
 
     def __init__(self, name, email, chess_id, birthday):
         if not name:
             raise ValueError("Player name is required!")
 
+        self._hash = None
         self.name = name
         self.email = email
         self.chess_id = chess_id
-
-        # The class uses a private attribute for the birthdate (datetime format)
-        self._birthdate = None
-        # And a public one with a getter/setter for the birthday (str)
+        # Raises ValueError if the birthday is not a valid date
         self.birthday = birthday
 
+    @classmethod
+    def from_rows(cls, rows):
+        """Creates players from (name, email, chess_id, birthday) rows, without the checks of the constructor.
+
+        Used to load players already validated (for instance from the club files): their birthdate is only
+        parsed when it is used.
+        """
+        new = object.__new__
+        # The slots are set directly, without going through the setters
+        set_name, set_email, set_chess_id, set_birthday, set_birthdate, set_hash = (
+            getattr(cls, slot).__set__ for slot in cls.__slots__
+        )
+        players = []
+        # Players born the same day share the birthday string
+        birthdays = {}
+        with gc_paused():
+            for name, email, chess_id, birthday in rows:
+                player = new(cls)
+                set_name(player, name)
+                set_email(player, email)
+                set_chess_id(player, chess_id)
+                set_birthday(player, birthdays.setdefault(birthday, birthday))
+                set_birthdate(player, None)
+                set_hash(player, None)
+                players.append(player)
+        return players
+
+    @classmethod
+    def _unpickle(cls, *row):
+        return cls.from_rows([row])[0]
+
+    def __reduce__(self):
+        # Only the fields are pickled (hashes of strings differ between processes), and they were validated already
+        return (type(self)._unpickle, (self._name, self._email, self._chess_id, self._birthday))
+
     def __str__(self):
         return f"<{self.name}>"
 
     def __hash__(self):
         """Returns the hash of the object - useful to use the instance as a key in a dictionary or in a set"""
-        return hash((self.name, self.email, self.chess_id, self.birthdate))
+        if self._hash is None:
+            self._hash = hash((self._name, self._email, self._chess_id, self._birthday))
+        return self._hash
 
     def __eq__(self, other):
         """Required when __hash__ is defined"""
         if type(other) is not type(self):
             raise TypeError("'=' is not supported with type %s" % type(other))
 
-        return (self.name, self.email, self.chess_id, self.birthdate) == (
-            other.name,
-            other.email,
-            other.chess_id,
-            other.birthdate,
+        return (self._name, self._email, self._chess_id, self._birthday) == (
+            other._name,
+            other._email,
+            other._chess_id,
+            other._birthday,
         )
 
+    # The setters of the hashed fields reset the hash: it is computed again on the next call
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self._hash = None
+
+    @property
+    def email(self):
+        return self._email
+
+    @email.setter
+    def email(self, value):
+        self._email = value
+        self._hash = None
+
+    @property
+    def chess_id(self):
+        return self._chess_id
+
+    @chess_id.setter
+    def chess_id(self, value):
+        self._chess_id = value
+        self._hash = None
+
     @property
     def birthday(self):
-        """Property to get the birthday (string) from the birthdate (datetime)"""
-        return self.birthdate.strftime(self.DATE_FORMAT)
+        """Property to get the birthday (str)"""
+        return self._birthday
 
     @birthday.setter
     def birthday(self, value):
-        """Sets the birthdate (datetime) from a string"""
-        self.birthdate = datetime.strptime(value, self.DATE_FORMAT)
+        """Sets the birthday (str), checked by parsing the birthdate from it"""
+        self._birthdate = parse_date(value, self.DATE_FORMAT)
+        self._birthday = value
+        self._hash = None
+
+    @property
+    def birthdate(self):
+        """Property to get the birthdate (datetime), parsed from the birthday on first use (see from_rows)"""
+        if self._birthdate is None:
+            self._birthdate = parse_date(self._birthday, self.DATE_FORMAT)
+        return self._birthdate
+
+    @birthdate.setter
+    def birthdate(self, value):
+        self.birthday = value.strftime(self.DATE_FORMAT)
+
+    @birthdate.setter
+    def birthdate(self, value):
+        self.birthday = value.strftime(self.DATE_FORMAT)
+        self._birthdate = value
 
     def serialize(self):
         """Serialize the instance in a format compatible with JSON"""
 
-        data = {attr: getattr(self, attr) for attr in ("name", "email", "chess_id")}
-        # We make sure to use the str representation of the date
-        # datetime is notnatively serializable in JSON
-        data["birthday"] = self.birthday
-        return data
+        return {"name": self._name, "email": self._email, "chess_id": self._chess_id, "birthday": self._birthday}
@@ -0,0 +1,96 @@
+import csv
+import json
+from pathlib import Path
+
+from .player import gc_paused
+
+FIELDS = ("name", "email", "chess_id", "birthday")
+
+
+def read_rows(filepath):
+    """Yields (line number, row) from a CSV file (with a header line) or a JSON lines file"""
+    filepath = Path(filepath)
+    with open(filepath, newline="") as fp:
+        if filepath.suffix == ".csv":
+            reader = csv.DictReader(fp)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(fp, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+
+
+class PlayerImport:
+    """
+    Imports players from a file into a club. The rows are validated with the PlayerManager
+    normalizers, and the rows that cannot be imported are written to a rejects file
+    (JSON lines, with the reason). The club is saved once, when all rows are read.
+    """
+
+    # Number of valid rows added to the club at once
+    CHUNK_SIZE = 10000
+
+    def __init__(self, player_manager, club):
+        self.player_manager = player_manager
+        self.club = club
+        # Chess IDs of the rows already imported (the others are checked in the federation registry)
+        self.chess_ids = set()
+        # Birthdays repeat a lot: each distinct value is only parsed once
+        self._birthdays = {}
+        self.imported = 0
+        self.rejected = 0
+
+    def _normalize_birthday(self, value):
+        if value not in self._birthdays:
+            self._birthdays[value] = self.player_manager.normalize_birthday(value)
+        return self._birthdays[value]
+
+    def validate(self, row):
+        """Returns (player fields, None) for a valid row, or (None, reason)"""
+        if row is None:
+            return None, "invalid row"
+
+        values = {field: str(row.get(field) or "") for field in FIELDS}
+        name = values["name"].strip()
+        if not name:
+            return None, "missing name"
+        email = self.player_manager.normalize_email(values["email"])
+        if not email:
+            return None, "invalid email"
+        chess_id = self.player_manager.normalize_chess_id(values["chess_id"])
+        if not chess_id:
+            return None, "invalid chess ID"
+        birthday = self._normalize_birthday(values["birthday"])
+        if not birthday:
+            return None, "invalid birthday"
+        if chess_id in self.chess_ids or self.player_manager.is_chess_id_taken(chess_id):
+            return None, "chess ID already taken"
+        return {"name": name, "email": email, "chess_id": chess_id, "birthday": birthday}, None
+
+    def run(self, filepath, rejects_filepath):
+        with gc_paused(), open(rejects_filepath, "w") as rejects, self.club.batch():
+            chunk = []
+            for line_number, row in read_rows(filepath):
+                fields, reason = self.validate(row)
+                if fields is None:
+                    rejects.write(json.dumps({"line": line_number, "reason": reason, "row": row}) + "\n")
+                    self.rejected += 1
+                    continue
+
+                chunk.append(fields)
+                self.chess_ids.add(fields["chess_id"])
+                if len(chunk) == self.CHUNK_SIZE:
+                    self._add(chunk)
+                    chunk = []
+            self._add(chunk)
+        return self.imported, self.rejected
+
+    def _add(self, chunk):
+        self.club.create_players(chunk)
+        self.imported += len(chunk)
@@ -1,7 +1,8 @@
 import re
 from datetime import datetime
 
-from .club_manager import ClubManager
+from .player_import import PlayerImport
+from .storage import get_club_manager
 
 
 class PlayerManager:
@@ -10,7 +11,7 @@ class PlayerManager:
     DATE_FORMAT = "%d-%m-%Y"
 
     def __init__(self, club_manager=None):
-        self.club_manager = club_manager or ClubManager()
+        self.club_manager = club_manager or get_club_manager()
 
     def list_clubs(self):
         return self.club_manager.clubs[:]
@@ -32,8 +33,13 @@ class PlayerManager:
             return normalized
         return None
 
-    def is_chess_id_taken(self, club, chess_id):
-        return any(player.chess_id == chess_id for player in club.players)
+    def is_chess_id_taken(self, chess_id, player=None):
+        """True if a player of any club (other than player, when editing one) has this chess ID"""
+        return self.club_manager.is_chess_id_taken(chess_id, player=player)
+
+    def chess_id_owners(self, chess_id):
+        """Returns the list of (club, player) with this chess ID"""
+        return self.club_manager.chess_id_owners(chess_id)
 
     def normalize_birthday(self, value):
         normalized = value.strip()
@@ -53,3 +59,13 @@ class PlayerManager:
             chess_id=chess_id,
             birthday=birthday,
         )
+
+    def import_players(self, club, filepath, rejects_filepath=None):
+        """Imports the players of a CSV or JSON lines file into the club.
+
+        The rejected rows are written to rejects_filepath (by default, next to the file).
+        Returns (number of imported players, number of rejected rows).
+        """
+        if rejects_filepath is None:
+            rejects_filepath = f"{filepath}.rejects.jsonl"
+        return PlayerImport(self, club).run(filepath, rejects_filepath)
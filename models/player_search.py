@@ -0,0 +1,116 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+
+
+def normalize_name(name):
+    """Normalized form of a player name, used for lookups: lowercase, single spaces"""
+    return " ".join(name.split()).lower()
+
+
+def trigrams(text):
+    """Set of the trigrams of a normalized text, each word being padded (like "  word ")"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class PlayerSearchIndex:
+    """Typo tolerant search over players: trigram index on names, plus chess ID prefixes.
+
+    Players are identified by id(): their attributes (and hash) change when they are updated.
+    """
+
+    CHESS_ID_PREFIX_REGEX = re.compile(r"^[A-Z]{1,2}[0-9]{0,5}$")
+
+    def __init__(self, players=()):
+        self._players = {}
+        self._names = {}
+        self._gram_counts = {}
+        self._trigrams = {}
+        # Sorted list of (chess ID, key) for prefix searches
+        self._chess_ids = []
+
+        for player in players:
+            self._index_name(player)
+            self._chess_ids.append((player.chess_id, id(player)))
+        self._chess_ids.sort()
+
+    def _index_name(self, player):
+        key = id(player)
+        name = normalize_name(player.name)
+        grams = trigrams(name)
+        self._players[key] = player
+        self._names[key] = name
+        self._gram_counts[key] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(key)
+
+    def add(self, player):
+        self._index_name(player)
+        insort(self._chess_ids, (player.chess_id, id(player)))
+
+    def remove(self, player, chess_id=None):
+        """Removes a player. chess_id is the indexed value, if it changed since it was added."""
+        key = id(player)
+        if key not in self._players:
+            return
+
+        for gram in trigrams(self._names.pop(key)):
+            keys = self._trigrams[gram]
+            keys.discard(key)
+            if not keys:
+                del self._trigrams[gram]
+        del self._players[key]
+        del self._gram_counts[key]
+
+        entry = (chess_id or player.chess_id, key)
+        index = bisect_left(self._chess_ids, entry)
+        if index < len(self._chess_ids) and self._chess_ids[index] == entry:
+            del self._chess_ids[index]
+
+    def search(self, query, limit=10):
+        """Returns up to limit players matching the query (name or chess ID prefix), best match first.
+
+        Scores: exact chess ID 3, exact name 2, name prefix 1.5, chess ID prefix 1.2,
+        otherwise the similarity of the trigram sets (0 to 1).
+        """
+        name = normalize_name(query)
+        if not name:
+            return []
+
+        scores = {}
+
+        chess_id = query.strip().upper()
+        if self.CHESS_ID_PREFIX_REGEX.match(chess_id):
+            index = bisect_left(self._chess_ids, (chess_id,))
+            while index < len(self._chess_ids) and self._chess_ids[index][0].startswith(chess_id):
+                indexed_chess_id, key = self._chess_ids[index]
+                scores[key] = 3 if indexed_chess_id == chess_id else 1.2
+                index += 1
+
+        # Only players sharing at least half of the query trigrams are candidates:
+        # they all appear in one of the rarest posting lists, so the common ones are not walked
+        postings = sorted((self._trigrams.get(gram, ()) for gram in trigrams(name)), key=len)
+        min_shared = max(1, (len(postings) + 1) // 2)
+        candidates = set().union(*postings[:len(postings) - min_shared + 1])
+
+        for key in candidates:
+            count = sum(1 for keys in postings if key in keys)
+            if count < min_shared:
+                continue
+            indexed_name = self._names[key]
+            if indexed_name == name:
+                score = 2
+            elif indexed_name.startswith(name):
+                score = 1.5
+            else:
+                score = count / (len(postings) + self._gram_counts[key] - count)
+            if score > scores.get(key, 0):
+                scores[key] = score
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [self._players[key] for key, _ in best]
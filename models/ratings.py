@@ -0,0 +1,182 @@
+import hashlib
+import json
+from pathlib import Path
+
+from .journal import write_snapshot
+
+
+def match_score(match):
+    """Score of player one: 1 for a win, 0.5 for a draw, 0 for a loss"""
+    if match.winner is None:
+        return 0.5
+    return 1.0 if match.winner == match.player_one_id else 0.0
+
+
+def rated_rounds(tournament):
+    """Returns the results of the completed rounds of a tournament: for each round, the list of
+    (player one, player two, score of player one)"""
+    rounds = []
+    for _, rnd in tournament.iter_rounds():
+        if not rnd.is_completed():
+            # Rounds are played in order: the next ones are not completed either
+            break
+        rounds.append([(match.player_one_id, match.player_two_id, match_score(match)) for match in rnd.matches])
+    return rounds
+
+
+def digest(data):
+    return hashlib.sha256(json.dumps(data, default=str).encode()).hexdigest()
+
+
+class RatingEngine:
+    """
+    Elo ratings of the players (as stored in the tournaments: names or chess IDs), from the results
+    of all the tournaments.
+
+    Each completed round is a rating period: the expected scores of its matches are computed from the
+    ratings before the round, and the rating changes are applied together at the end of the round.
+    The tournaments are rated in date order. The state (ratings, and per tournament a checkpoint: the
+    number of rounds rated and a digest of their results) is saved in data/tournaments/.ratings, so
+    only the rounds completed since are rated on the next update.
+
+    A round completed later is rated on top of the current ratings. If the result of a round already
+    rated changes (or a rated tournament is removed), all the tournaments are rated again.
+    """
+
+    FILENAME = ".ratings"
+    # Changes when the saved state changes format
+    VERSION = 1
+    INITIAL_RATING = 1500
+    K_FACTOR = 20
+    # Tournaments read at once (see TournamentManager.map_tournaments)
+    CHUNK_SIZE = 500
+
+    def __init__(self, tournament_manager):
+        self.tournament_manager = tournament_manager
+        self.filepath = tournament_manager.data_folder / self.FILENAME
+        self._reset()
+        try:
+            with open(self.filepath) as fp:
+                state = json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        if state.get("version") == self.VERSION:
+            self._ratings = state["ratings"]
+            self._games = state["games"]
+            self._checkpoints = state["checkpoints"]
+
+    def _reset(self):
+        # Player -> rating, and player -> number of rated games
+        self._ratings = {}
+        self._games = {}
+        # Tournament filename -> {"key", "rounds", "digest"}
+        self._checkpoints = {}
+
+    def save(self):
+        write_snapshot(
+            self.filepath,
+            {
+                "version": self.VERSION,
+                "ratings": self._ratings,
+                "games": self._games,
+                "checkpoints": self._checkpoints,
+            },
+        )
+
+    def rating(self, player):
+        return self._ratings.get(player, self.INITIAL_RATING)
+
+    def ranking(self):
+        """Returns the list of (player, rating, games), best rating first"""
+        return sorted(
+            ((player, rating, self._games[player]) for player, rating in self._ratings.items()),
+            key=lambda row: row[1],
+            reverse=True,
+        )
+
+    def rate_round(self, results):
+        """Rates the (player one, player two, score of player one) results of one round"""
+        ratings = self._ratings
+        initial = self.INITIAL_RATING
+        k_factor = self.K_FACTOR
+        changes = []
+        for player_one, player_two, score in results:
+            expected = 1 / (1 + 10 ** ((ratings.get(player_two, initial) - ratings.get(player_one, initial)) / 400))
+            change = k_factor * (score - expected)
+            changes.append((player_one, change))
+            changes.append((player_two, -change))
+
+        games = self._games
+        for player, change in changes:
+            ratings[player] = ratings.get(player, initial) + change
+            games[player] = games.get(player, 0) + 1
+        return len(results)
+
+    def _rate_tournament(self, filename, key, rounds):
+        """Rates the rounds not rated yet. Returns the number of games rated, or None if a round
+        already rated changed"""
+        checkpoint = self._checkpoints.get(filename)
+        rated = checkpoint["rounds"] if checkpoint else 0
+        if checkpoint and (len(rounds) < rated or checkpoint["digest"] != digest(rounds[:rated])):
+            return None
+
+        games = sum(self.rate_round(results) for results in rounds[rated:])
+        self._checkpoints[filename] = {"key": key, "rounds": len(rounds), "digest": digest(rounds)}
+        return games
+
+    def update(self, rebuild=False):
+        """Rates the rounds completed since the last update (all the rounds if rebuild is True)
+        and saves the state. Returns the number of games rated."""
+        if rebuild:
+            self._reset()
+
+        manager = self.tournament_manager
+        entries = sorted(manager.catalog.entries(), key=lambda entry: entry[1].start_date)
+        filenames = {filepath.name for filepath, _ in entries}
+        if any(filename not in filenames for filename in self._checkpoints):
+            return self.update(rebuild=True)
+
+        # Only the tournaments changed since their checkpoint are read
+        to_read = []
+        for filepath, _ in entries:
+            key = digest(manager.state_key(filepath))
+            checkpoint = self._checkpoints.get(filepath.name)
+            if checkpoint is None or checkpoint["key"] != key:
+                to_read.append((filepath, key))
+
+        games = 0
+        for start in range(0, len(to_read), self.CHUNK_SIZE):
+            chunk = to_read[start:start + self.CHUNK_SIZE]
+            results = manager.map_tournaments(rated_rounds, [filepath for filepath, _ in chunk])
+            for (filepath, key), rounds in zip(chunk, results):
+                rated = self._rate_tournament(filepath.name, key, rounds)
+                if rated is None:
+                    return self.update(rebuild=True)
+                games += rated
+
+        if to_read or rebuild or not self.filepath.exists():
+            self.save()
+        return games
+
+    def update_tournament(self, tournament):
+        """Rates the rounds of a (loaded) tournament completed since it was last rated.
+        Returns the number of games rated (None if a round already rated changed: see update).
+
+        Called after each result: only the round following the rated ones is looked at, unless it is completed.
+        """
+        if not self.filepath.exists():
+            # The ratings were never computed: update rates all the tournaments, in date order
+            return 0
+        filename = Path(tournament.filepath).name
+        checkpoint = self._checkpoints.get(filename)
+        rated = checkpoint["rounds"] if checkpoint else 0
+        rounds = [rnd for _, rnd in tournament.iter_rounds()]
+        if len(rounds) <= rated or not rounds[rated].is_completed():
+            # No new round: the checkpoint is brought up to date on the next update
+            return 0
+
+        key = digest(self.tournament_manager.state_key(self.tournament_manager.data_folder / filename))
+        games = self._rate_tournament(filename, key, rated_rounds(tournament))
+        if games:
+            self.save()
+        return games
@@ -1,11 +1,17 @@
+import json
+
 from .match import Match
 
 
 class Round:
     # A TOURNAMENT ROUND CONSISTS OF SEVERAL MATCHES
 
+    __slots__ = ("matches", "_encoded")
+
     def __init__(self, matches=None):
         self.matches = []
+        # JSON text of the round (see encode), None when a match changed since it was encoded
+        self._encoded = None
         if matches:
             for match in matches:
                 if isinstance(match, Match):
@@ -15,6 +21,12 @@ class Round:
 
     def add_match(self, match):
         self.matches.append(match)
+        self._encoded = None
+
+    def set_result(self, match, winner=None):
+        """Sets the result of one of the matches of the round (see Match.set_result)"""
+        match.set_result(winner)
+        self._encoded = None
 
     def is_completed(self):
         if not self.matches:
@@ -24,6 +36,13 @@ class Round:
     def serialize(self):
         return [match.serialize() for match in self.matches]
 
+    def encode(self):
+        """Returns the JSON text of serialize(), only encoded again when a match of the round changed
+        (the results must be set with set_result)"""
+        if self._encoded is None:
+            self._encoded = json.dumps(self.serialize())
+        return self._encoded
+
     @classmethod
     def from_list(cls, data):
         return cls(matches=[Match.from_dict(item) for item in data])
@@ -0,0 +1,588 @@
+"""
+SQLite storage backend for clubs and tournaments (standard library sqlite3).
+
+The managers below implement the same interface as ClubManager and TournamentManager.
+Changes recorded by the models (see Journal) are applied as single-row statements on save,
+so recording a result or updating a player only touches the affected rows.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from .club import ChessClub
+from .club_manager import ClubManager
+from .journal import Journal
+from .player import Player
+from .player_search import normalize_name
+from .tournament import Tournament
+from .tournament_manager import TournamentManager
+from .tournament_summary import TournamentSummary
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clubs (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    club_id INTEGER NOT NULL REFERENCES clubs(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    chess_id TEXT NOT NULL,
+    birthday TEXT NOT NULL,
+    PRIMARY KEY (club_id, position)
+);
+CREATE INDEX IF NOT EXISTS players_chess_id ON players(chess_id);
+CREATE INDEX IF NOT EXISTS players_normalized_name ON players(normalized_name);
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    date_from TEXT NOT NULL,
+    date_to TEXT NOT NULL,
+    number_of_rounds INTEGER NOT NULL,
+    current_round INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    pairing TEXT NOT NULL,
+    tiebreaks TEXT NOT NULL,
+    -- Incremented on each save (see SQLiteTournamentManager.state_key)
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tournaments_completed ON tournaments(completed);
+CREATE TABLE IF NOT EXISTS tournament_players (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id),
+    position INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, position)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id),
+    round_number INTEGER NOT NULL,
+    match_number INTEGER NOT NULL,
+    player_one TEXT NOT NULL,
+    player_two TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    winner TEXT,
+    PRIMARY KEY (tournament_id, round_number, match_number)
+);
+"""
+
+# Statements are constants: sqlite3 keeps them prepared in its statement cache
+INSERT_PLAYER = """
+    INSERT INTO players (club_id, position, name, normalized_name, email, chess_id, birthday)
+    VALUES (?, (SELECT COUNT(*) FROM players WHERE club_id = ?), ?, ?, ?, ?, ?)
+"""
+UPDATE_PLAYER = """
+    UPDATE players SET name = ?, normalized_name = ?, email = ?, chess_id = ?, birthday = ?
+    WHERE club_id = ? AND position = ?
+"""
+INSERT_TOURNAMENT_PLAYER = """
+    INSERT INTO tournament_players (tournament_id, position, player)
+    VALUES (?, (SELECT COUNT(*) FROM tournament_players WHERE tournament_id = ?), ?)
+"""
+INSERT_MATCH = """
+    INSERT INTO matches (tournament_id, round_number, match_number, player_one, player_two, completed, winner)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+UPDATE_MATCH = """
+    UPDATE matches SET completed = 1, winner = ?
+    WHERE tournament_id = ? AND round_number = ? AND match_number = ?
+"""
+
+
+class Connection(sqlite3.Connection):
+    """A connection shared by the program and the write-behind threads of the clubs.
+
+    Statements and transactions (with db: ...) hold the lock of the connection, so that a thread
+    never runs statements inside the transaction of another one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self.lock.release()
+
+    def execute(self, *args):
+        with self.lock:
+            return super().execute(*args)
+
+    def executemany(self, *args):
+        with self.lock:
+            return super().executemany(*args)
+
+
+def connect(db_path):
+    """Opens the database (in WAL mode) and creates the tables if needed"""
+    # Clubs can be saved by their write-behind thread (see Connection)
+    db = sqlite3.connect(db_path, check_same_thread=False, factory=Connection)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA foreign_keys=ON")
+    db.executescript(SCHEMA)
+    # Databases created before the version column
+    columns = [row[1] for row in db.execute("PRAGMA table_info(tournaments)")]
+    if "version" not in columns:
+        with db:
+            db.execute("ALTER TABLE tournaments ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    return db
+
+
+class SQLiteChessClub(ChessClub):
+    """A chess club stored in the database. Its players are only loaded when they are used."""
+
+    def __init__(self, db, club_id, name):
+        # With both a filepath and a name, ChessClub neither loads nor saves anything
+        super().__init__(filepath=f"club:{club_id}", name=name)
+        self.db = db
+        self.club_id = club_id
+        self._players = None
+
+    @property
+    def players(self):
+        if self._players is None:
+            rows = self.db.execute(
+                "SELECT name, email, chess_id, birthday FROM players WHERE club_id = ? ORDER BY position",
+                (self.club_id,),
+            ).fetchall()
+            self._players = Player.from_rows(rows)
+        return self._players
+
+    @players.setter
+    def players(self, value):
+        self._players = value
+
+    def _write(self):
+        with self.db:
+            for change in self._changes:
+                data = change["player"]
+                if change["op"] == "create":
+                    self.db.execute(
+                        INSERT_PLAYER,
+                        (
+                            self.club_id,
+                            self.club_id,
+                            data["name"],
+                            normalize_name(data["name"]),
+                            data["email"],
+                            data["chess_id"],
+                            data["birthday"],
+                        ),
+                    )
+                elif change["op"] == "update":
+                    self.db.execute(
+                        UPDATE_PLAYER,
+                        (
+                            data["name"],
+                            normalize_name(data["name"]),
+                            data["email"],
+                            data["chess_id"],
+                            data["birthday"],
+                            self.club_id,
+                            change["index"],
+                        ),
+                    )
+        self._changes = []
+        self._snapshot_needed = False
+
+
+class SQLiteClubManager(ClubManager):
+    """Club manager reading from the database: player lookups use the indexed tables"""
+
+    def __init__(self, db_path, write_behind=None):
+        self.db = connect(db_path)
+        self._clubs_by_id = {}
+        # Changes when another connection writes to the database (see refresh)
+        self._data_version = None
+        super().__init__(data_folder=Path(db_path).parent, write_behind=write_behind)
+
+    def _load_clubs(self):
+        self._data_version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        for club_id, name in self.db.execute("SELECT id, name FROM clubs ORDER BY id").fetchall():
+            if club_id not in self._clubs_by_id:
+                self._add_club(SQLiteChessClub(self.db, club_id, name))
+
+    def refresh(self):
+        """Loads the clubs created by another program, and reloads the players of the other clubs
+        if the database was changed"""
+        if self.db.execute("PRAGMA data_version").fetchone()[0] == self._data_version:
+            return
+
+        names = dict(self.db.execute("SELECT id, name FROM clubs").fetchall())
+        for club in self.clubs:
+            if not club._changes and club._players is not None:
+                club.name = names.get(club.club_id, club.name)
+                self._reload_players(club)
+        self._search_index = None
+        self._load_clubs()
+
+    def _reload_players(self, club):
+        """Updates the loaded players of a club from the table, in place: the Player instances
+        held by the program stay the club's players"""
+        rows = self.db.execute(
+            "SELECT name, email, chess_id, birthday FROM players WHERE club_id = ? ORDER BY position",
+            (club.club_id,),
+        ).fetchall()
+        players = club._players
+        for position, row in enumerate(rows):
+            if position < len(players):
+                player = players[position]
+                for key, value in zip(Player.FIELDS, row):
+                    if getattr(player, key) != value:
+                        setattr(player, key, value)
+            else:
+                players.extend(Player.from_rows([row]))
+
+    def _flush_clubs(self):
+        # The tables must include the changes of deferred saves
+        for club in self.clubs:
+            if club._changes:
+                club.flush()
+
+    def _owner(self, club_id, position, row):
+        """Returns (club, player) for a selected player row (position, then name, email, chess_id, birthday).
+
+        The player of a club already loaded is the club's instance (so that it can be edited);
+        otherwise it is built from the row only, without loading the other players of the club.
+        """
+        club = self._clubs_by_id[club_id]
+        if club._players is not None and position < len(club._players):
+            return club, club._players[position]
+        return club, Player.from_rows([row])[0]
+
+    def _find(self, where, value):
+        """Returns the list of (club, player) matching the condition"""
+        self._flush_clubs()
+        rows = self.db.execute(
+            f"""
+            SELECT club_id, position, name, email, chess_id, birthday FROM players
+            WHERE {where} = ? ORDER BY club_id, position
+            """,
+            (value,),
+        ).fetchall()
+        return [self._owner(club_id, position, row) for club_id, position, *row in rows]
+
+    def _on_player_change(self, club, player, previous):
+        # The tables are the indexes: only the search index is kept in memory
+        if self._search_index is not None:
+            if previous is not None:
+                self._search_index.remove(player, chess_id=previous["chess_id"])
+            self._search_index.add(player)
+
+    def chess_id_owners(self, chess_id):
+        return self._find("chess_id", chess_id)
+
+    def is_chess_id_taken(self, chess_id, player=None):
+        # The players table is the registry
+        return any(owner is not player for _, owner in self.chess_id_owners(chess_id))
+
+    def chess_id_duplicates(self):
+        self._flush_clubs()
+        duplicates = {}
+        rows = self.db.execute(
+            "SELECT chess_id, club_id, position, name, email, chess_id, birthday FROM players WHERE chess_id IN"
+            " (SELECT chess_id FROM players GROUP BY chess_id HAVING COUNT(*) > 1)"
+            " ORDER BY chess_id, club_id, position"
+        )
+        for chess_id, club_id, position, *row in rows.fetchall():
+            duplicates.setdefault(chess_id, []).append(self._owner(club_id, position, row))
+        return duplicates
+
+    def player_names(self):
+        self._flush_clubs()
+        return dict(
+            self.db.execute("SELECT chess_id, MIN(name) FROM players GROUP BY chess_id HAVING COUNT(*) = 1").fetchall()
+        )
+
+    def find_by_name(self, name):
+        return [player for _, player in self._find("normalized_name", normalize_name(name))]
+
+    def create(self, name):
+        with self.db:
+            club_id = self.db.execute(
+                "INSERT INTO clubs (filename, name) VALUES (?, ?)", (name.replace(" ", "") + ".json", name)
+            ).lastrowid
+        club = SQLiteChessClub(self.db, club_id, name)
+        club._players = []
+        self._add_club(club)
+        return club
+
+    def _add_club(self, club):
+        self.clubs.append(club)
+        self._clubs_by_id[club.club_id] = club
+        if self.write_behind is not None:
+            club.set_write_behind(self.write_behind)
+        club.add_listener(self._on_player_change)
+
+
+class SQLiteTournament(Tournament):
+    """A tournament stored in the database"""
+
+    db = None
+    tournament_id = None
+
+    def save(self):
+        with self.db:
+            if self._snapshot_needed:
+                self.tournament_id = insert_tournament(self.db, Path(self.filepath).name, self.serialize())
+            elif self._changes:
+                for change in self._changes:
+                    self._save_change(change)
+                self.db.execute("UPDATE tournaments SET version = version + 1 WHERE id = ?", (self.tournament_id,))
+        self._changes = []
+        self._snapshot_needed = False
+
+    def _save_change(self, change):
+        op = change["op"]
+        if op == "player":
+            self.db.execute(INSERT_TOURNAMENT_PLAYER, (self.tournament_id, self.tournament_id, change["name"]))
+        elif op == "round":
+            insert_round(self.db, self.tournament_id, change["round"], change["matches"])
+            self.db.execute(
+                "UPDATE tournaments SET current_round = ? WHERE id = ?", (change["round"], self.tournament_id)
+            )
+        elif op == "result":
+            self.db.execute(
+                UPDATE_MATCH, (change["winner"], self.tournament_id, change["round"], change["match"])
+            )
+        elif op == "completed":
+            self.db.execute("UPDATE tournaments SET completed = 1 WHERE id = ?", (self.tournament_id,))
+
+
+def insert_round(db, tournament_id, round_number, matches):
+    db.executemany(
+        INSERT_MATCH,
+        [
+            (
+                tournament_id,
+                round_number,
+                match_number,
+                match["players"][0],
+                match["players"][1],
+                int(match.get("completed", False)),
+                match.get("winner"),
+            )
+            for match_number, match in enumerate(matches, 1)
+        ],
+    )
+
+
+def insert_tournament(db, filename, data):
+    """Inserts (or replaces) a serialized tournament, returns its id"""
+    row = db.execute("SELECT id, version FROM tournaments WHERE filename = ?", (filename,)).fetchone()
+    version = 0
+    if row is not None:
+        # The replaced tournament keeps counting its versions (its id may be reused)
+        tournament_id, version = row
+        version += 1
+        db.execute("DELETE FROM matches WHERE tournament_id = ?", (tournament_id,))
+        db.execute("DELETE FROM tournament_players WHERE tournament_id = ?", (tournament_id,))
+        db.execute("DELETE FROM tournaments WHERE id = ?", (tournament_id,))
+
+    tournament_id = db.execute(
+        """
+        INSERT INTO tournaments (
+            filename, name, venue, date_from, date_to, number_of_rounds, current_round, completed, pairing, tiebreaks,
+            version
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            filename,
+            data["name"],
+            data["venue"],
+            data["dates"]["from"],
+            data["dates"]["to"],
+            data["number_of_rounds"],
+            # The index of the current round is kept for completed tournaments too
+            data.get("current_round") or len(data.get("rounds", [])),
+            int(data.get("completed", False)),
+            data.get("pairing", "swiss"),
+            json.dumps(data.get("tiebreaks")),
+            version,
+        ),
+    ).lastrowid
+    db.executemany(
+        "INSERT INTO tournament_players (tournament_id, position, player) VALUES (?, ?, ?)",
+        [(tournament_id, position, player) for position, player in enumerate(data.get("players", []))],
+    )
+    for round_number, matches in enumerate(data.get("rounds", []), 1):
+        insert_round(db, tournament_id, round_number, matches)
+    return tournament_id
+
+
+def read_tournament(db, tournament_id):
+    """Reads a tournament from the database, in the format of Tournament.serialize"""
+    (name, venue, date_from, date_to, number_of_rounds, current_round, completed, pairing, tiebreaks) = db.execute(
+        """
+        SELECT name, venue, date_from, date_to, number_of_rounds, current_round, completed, pairing, tiebreaks
+        FROM tournaments WHERE id = ?
+        """,
+        (tournament_id,),
+    ).fetchone()
+
+    rounds = []
+    rows = db.execute(
+        """
+        SELECT round_number, player_one, player_two, completed, winner FROM matches
+        WHERE tournament_id = ? ORDER BY round_number, match_number
+        """,
+        (tournament_id,),
+    ).fetchall()
+    for round_number, player_one, player_two, match_completed, winner in rows:
+        if round_number > len(rounds):
+            rounds.append([])
+        rounds[-1].append(
+            {"players": [player_one, player_two], "completed": bool(match_completed), "winner": winner}
+        )
+
+    players = [
+        player
+        for (player,) in db.execute(
+            "SELECT player FROM tournament_players WHERE tournament_id = ? ORDER BY position", (tournament_id,)
+        ).fetchall()
+    ]
+
+    return {
+        "name": name,
+        "dates": {"from": date_from, "to": date_to},
+        "venue": venue,
+        "number_of_rounds": number_of_rounds,
+        "current_round": None if completed else current_round,
+        "completed": bool(completed),
+        "pairing": pairing,
+        "tiebreaks": json.loads(tiebreaks),
+        "players": players,
+        "rounds": rounds,
+    }
+
+
+def load_tournament(db, filepath):
+    """Returns the tournament stored under the file name of filepath (KeyError if there is none)"""
+    row = db.execute("SELECT id FROM tournaments WHERE filename = ?", (Path(filepath).name,)).fetchone()
+    if row is None:
+        raise KeyError(Path(filepath).name)
+    (tournament_id,) = row
+    tournament = SQLiteTournament.from_dict(read_tournament(db, tournament_id), filepath=filepath)
+    tournament.db = db
+    tournament.tournament_id = tournament_id
+    tournament._snapshot_needed = False
+    return tournament
+
+
+class SQLiteTournamentManager(TournamentManager):
+    """Tournament manager reading from and saving to the database.
+
+    Tournaments keep a file path (data_folder / filename) so they can be migrated back to JSON files.
+    """
+
+    def __init__(self, db_path, data_folder="data/tournaments"):
+        self.db = connect(db_path)
+        super().__init__(data_folder=data_folder)
+
+    def _load_tournaments(self):
+        rows = self.db.execute(
+            """
+            SELECT t.filename, t.name, t.venue, t.date_from, t.date_to, t.number_of_rounds, t.current_round,
+                t.completed, t.id
+            FROM tournaments t ORDER BY t.id
+            """
+        ).fetchall()
+        players = {}
+        for tournament_id, player in self.db.execute(
+            "SELECT tournament_id, player FROM tournament_players ORDER BY tournament_id, position"
+        ).fetchall():
+            players.setdefault(tournament_id, []).append(player)
+
+        for row in rows:
+            filename, name, venue, date_from, date_to, number_of_rounds, current_round, completed, tournament_id = row
+            summary = TournamentSummary(
+                name=name,
+                venue=venue,
+                date_from=date_from,
+                date_to=date_to,
+                number_of_rounds=number_of_rounds,
+                current_round=None if completed else current_round,
+                completed=bool(completed),
+                players=players.get(tournament_id, []),
+            )
+            self.catalog.add(self.data_folder / filename, summary)
+
+    def read_tournament(self, filepath):
+        return load_tournament(self.db, filepath)
+
+    def map_tournaments(self, function, filepaths):
+        # The connection cannot be shared with other processes
+        return [function(self.read_tournament(filepath)) for filepath in filepaths]
+
+    def state_key(self, filepath):
+        # No file to look at: the version counter of the tournament changes on each save
+        row = self.db.execute(
+            "SELECT id, version FROM tournaments WHERE filename = ?", (Path(filepath).name,)
+        ).fetchone()
+        return list(row)
+
+    def is_filepath_taken(self, filepath):
+        row = self.db.execute("SELECT 1 FROM tournaments WHERE filename = ?", (Path(filepath).name,)).fetchone()
+        return row is not None
+
+    def new_tournament(self, **kwargs):
+        tournament = SQLiteTournament(**kwargs)
+        tournament.db = self.db
+        return tournament
+
+
+def migrate_to_sqlite(db_path, club_manager, tournament_manager):
+    """Copies all clubs and tournaments (JSON files) to the database, replacing its content"""
+    db = connect(db_path)
+    with db:
+        for table in ("matches", "tournament_players", "tournaments", "players", "clubs"):
+            db.execute(f"DELETE FROM {table}")
+
+        for club in club_manager.clubs:
+            club_id = db.execute(
+                "INSERT INTO clubs (filename, name) VALUES (?, ?)", (Path(club.filepath).name, club.name)
+            ).lastrowid
+            db.executemany(
+                """
+                INSERT INTO players (club_id, position, name, normalized_name, email, chess_id, birthday)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (club_id, position, p.name, normalize_name(p.name), p.email, p.chess_id, p.birthday)
+                    for position, p in enumerate(club.players)
+                ],
+            )
+
+        for filepath, _ in tournament_manager.catalog.entries():
+            tournament = tournament_manager.load_tournament(filepath)
+            insert_tournament(db, Path(filepath).name, tournament.serialize())
+    db.close()
+
+
+def migrate_to_json(db_path, clubs_folder="data/clubs", tournaments_folder="data/tournaments"):
+    """Writes all clubs and tournaments of the database to JSON files (with no journal)"""
+    db = connect(db_path)
+    clubs_folder = Path(clubs_folder)
+    tournaments_folder = Path(tournaments_folder)
+    clubs_folder.mkdir(parents=True, exist_ok=True)
+    tournaments_folder.mkdir(parents=True, exist_ok=True)
+
+    for club_id, filename, name in db.execute("SELECT id, filename, name FROM clubs ORDER BY id").fetchall():
+        club = SQLiteChessClub(db, club_id, name)
+        Journal(clubs_folder / filename).compact(club.serialize())
+
+    for tournament_id, filename in db.execute("SELECT id, filename FROM tournaments ORDER BY id").fetchall():
+        Journal(tournaments_folder / filename).compact(read_tournament(db, tournament_id))
+    db.close()
@@ -0,0 +1,62 @@
+"""Chooses the storage backend: JSON files (default) or a SQLite database."""
+import os
+
+from .club_manager import ClubManager
+from .tournament_manager import TournamentManager
+
+# Path of the SQLite database. When it is not set, data is stored in JSON files.
+DATABASE_ENV = "CHESS_DATABASE"
+# Delay (seconds) before club changes are written in the background. When it is not set,
+# every change is written immediately.
+WRITE_BEHIND_ENV = "CHESS_WRITE_BEHIND"
+# When set (to any value), clubs are loaded from a binary snapshot of the JSON files (see club_snapshot)
+SNAPSHOT_ENV = "CHESS_SNAPSHOT"
+
+
+def database_path():
+    return os.environ.get(DATABASE_ENV) or None
+
+
+def write_behind_delay():
+    value = os.environ.get(WRITE_BEHIND_ENV)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def make_club_manager():
+    db_path = database_path()
+    if db_path:
+        from .sqlite_storage import SQLiteClubManager
+
+        return SQLiteClubManager(db_path, write_behind=write_behind_delay())
+    return ClubManager(write_behind=write_behind_delay(), snapshot=bool(os.environ.get(SNAPSHOT_ENV)))
+
+
+# Club managers shared by the whole program (see get_club_manager), by database path
+_club_managers = {}
+
+
+def get_club_manager():
+    """Returns the club manager shared by the whole program.
+
+    The clubs are only loaded once: on the next calls, the files changed since are reloaded.
+    """
+    db_path = database_path()
+    manager = _club_managers.get(db_path)
+    if manager is None:
+        manager = _club_managers[db_path] = make_club_manager()
+    else:
+        manager.refresh()
+    return manager
+
+
+def make_tournament_manager(workers=None):
+    """workers: number of processes used to read the tournament files (see loader.load_files)"""
+    db_path = database_path()
+    if db_path:
+        from .sqlite_storage import SQLiteTournamentManager
+
+        return SQLiteTournamentManager(db_path)
+    return TournamentManager(workers=workers)
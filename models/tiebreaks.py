@@ -0,0 +1,90 @@
+"""Tiebreak systems used to rank players with the same number of points.
+
+Each tiebreak function gets the results of every player (player id -> list of
+(opponent id, score, round number) for completed matches) and the points table
+(indexed by player id), and returns a dictionary player id -> tiebreak value.
+"""
+
+
+def player_results(rounds, player_id):
+    """Builds player id -> list of (opponent id, score, round number) from the tournament rounds
+
+    player_id is the function giving the id of a player from the value stored in a match.
+    """
+    results = {}
+    for round_number, rnd in enumerate(rounds, 1):
+        for match in rnd.matches:
+            if not match.completed:
+                continue
+
+            p1 = player_id(match.player_one_id)
+            p2 = player_id(match.player_two_id)
+            if match.winner == match.player_one_id:
+                score_one, score_two = 1, 0
+            elif match.winner == match.player_two_id:
+                score_one, score_two = 0, 1
+            else:
+                score_one, score_two = 0.5, 0.5
+
+            results.setdefault(p1, []).append((p2, score_one, round_number))
+            results.setdefault(p2, []).append((p1, score_two, round_number))
+    return results
+
+
+def buchholz(results, points):
+    """Sum of the points of all opponents"""
+    return {
+        player: sum(points[opponent] for opponent, _, _ in games)
+        for player, games in results.items()
+    }
+
+
+def median_buchholz(results, points):
+    """Buchholz without the best and the worst opponent"""
+    values = {}
+    for player, games in results.items():
+        scores = sorted(points[opponent] for opponent, _, _ in games)
+        if len(scores) > 2:
+            scores = scores[1:-1]
+        values[player] = sum(scores)
+    return values
+
+
+def sonneborn_berger(results, points):
+    """Points of the beaten opponents, plus half the points of the opponents drawn against"""
+    return {
+        player: sum(score * points[opponent] for opponent, score, _ in games)
+        for player, games in results.items()
+    }
+
+
+def wins(results, points):
+    """Number of games won"""
+    return {
+        player: sum(1 for _, score, _ in games if score == 1)
+        for player, games in results.items()
+    }
+
+
+def progressive(results, points):
+    """Sum of the running score after each round"""
+    values = {}
+    for player, games in results.items():
+        running = 0
+        total = 0
+        for _, score, _ in sorted(games, key=lambda game: game[2]):
+            running += score
+            total += running
+        values[player] = total
+    return values
+
+
+TIEBREAKS = {
+    "buchholz": buchholz,
+    "median_buchholz": median_buchholz,
+    "sonneborn_berger": sonneborn_berger,
+    "wins": wins,
+    "progressive": progressive,
+}
+
+DEFAULT_TIEBREAKS = ["buchholz", "sonneborn_berger", "wins"]
@@ -1,9 +1,13 @@
 import json
 from datetime import date, datetime
 import random
+from operator import itemgetter
+from .journal import Journal
 from .player import Player
 from .round import Round
 from .match import Match
+from .pairing import PAIRING_STRATEGIES
+from .tiebreaks import DEFAULT_TIEBREAKS, TIEBREAKS, player_results
 
 class Tournament:
     
@@ -23,12 +27,21 @@ class Tournament:
         _player_names: list[str]| None = None,
         _completed: bool = False,
         filepath=None,
+        pairing: str = "swiss",
+        tiebreaks: list[str] | None = None,
 
     ):
         if end_date < start_date:
             raise ValueError("end_date must be >= start_date")
         if number_of_rounds <= 0:
             raise ValueError("number_of_rounds must be > 0")
+        if pairing not in PAIRING_STRATEGIES:
+            raise ValueError(f"pairing must be one of: {', '.join(PAIRING_STRATEGIES)}")
+        if tiebreaks is None:
+            tiebreaks = DEFAULT_TIEBREAKS[:]
+        for tiebreak in tiebreaks:
+            if tiebreak not in TIEBREAKS:
+                raise ValueError(f"tiebreaks must be among: {', '.join(TIEBREAKS)}")
 
         self.name = name
         self.filepath = filepath
@@ -36,6 +49,8 @@ class Tournament:
         self.start_date = start_date
         self.end_date = end_date
         self.number_of_rounds = number_of_rounds
+        self.pairing = pairing
+        self.tiebreaks = tiebreaks
         
         self._rounds = []
         if _rounds:
@@ -51,13 +66,52 @@ class Tournament:
         self._player_names = _player_names or []
         self._completed = _completed
 
+        # Changes not saved yet, appended to the journal on save
+        self._changes = []
+        self._journal = None
+        # A tournament that was not loaded from its file is fully written on its first save
+        self._snapshot_needed = True
+
+        # Players are interned as dense integer ids: the tables below are indexed by id,
+        # names (or chess IDs) are only used in matches, serialization and results.
+        self._ids = {}
+        self._names = []
+        # Running score table (id -> points), updated as results are recorded
+        self._points = []
+        # Opponent index: id -> set of opponent ids, and id -> list of
+        # (opponent id, round number, colour)
+        self._opponents = []
+        self._pairing_history = []
+        for name in self._player_names:
+            self._intern(name)
+
+        # Both are built once from the rounds here, then kept up to date
+        self._ranking = None
+        self._rebuild_standings()
+        for round_number, rnd in enumerate(self._rounds, 1):
+            self._index_round(rnd, round_number)
+
+    def _intern(self, name):
+        player_id = self._ids.get(name)
+        if player_id is None:
+            player_id = len(self._names)
+            self._ids[name] = player_id
+            self._names.append(name)
+            self._points.append(0)
+            self._opponents.append(set())
+            self._pairing_history.append([])
+        return player_id
+
     def register_player(self, player):
         if self._completed:
             return None
         if not isinstance(player, Player):
             return None
-        if player.name not in self._player_names:
+        if player.name not in self._ids:
+            self._intern(player.name)
             self._player_names.append(player.name)
+            self._ranking = None
+            self._changes.append({"op": "player", "name": player.name})
         return player.name
     
     def get_current_round(self):
@@ -83,16 +137,45 @@ class Tournament:
             new_round.add_match(match)
             i += 2
 
-        self._rounds.append(new_round)
-        self._current_round_index = 1
+        self._add_round(new_round)
         return new_round
 
-    def _played_pairs(self):
-        played = set()
-        for rnd in self._rounds:
-            for match in rnd.matches:
-                played.add(frozenset(match.players))
-        return played
+    def _add_round(self, new_round):
+        self._rounds.append(new_round)
+        self._index_round(new_round, len(self._rounds))
+        self._current_round_index = len(self._rounds)
+        self._changes.append({"op": "round", "round": len(self._rounds), "matches": new_round.serialize()})
+
+    def _index_round(self, rnd, round_number):
+        for match in rnd.matches:
+            p1 = self._intern(match.player_one_id)
+            p2 = self._intern(match.player_two_id)
+            self._opponents[p1].add(p2)
+            self._opponents[p2].add(p1)
+            self._pairing_history[p1].append((p2, round_number, "white"))
+            self._pairing_history[p2].append((p1, round_number, "black"))
+
+    def _has_played_ids(self, player_one_id, player_two_id):
+        return player_two_id in self._opponents[player_one_id]
+
+    def has_played(self, player_one, player_two):
+        if player_one not in self._ids or player_two not in self._ids:
+            return False
+        return self._has_played_ids(self._ids[player_one], self._ids[player_two])
+
+    def opponents_of(self, player):
+        if player not in self._ids:
+            return set()
+        return {self._names[opponent_id] for opponent_id in self._opponents[self._ids[player]]}
+
+    def pairing_history(self, player):
+        # List of (opponent, round number, colour) - player one of a match has white
+        if player not in self._ids:
+            return []
+        return [
+            (self._names[opponent_id], round_number, colour)
+            for opponent_id, round_number, colour in self._pairing_history[self._ids[player]]
+        ]
 
     def generate_next_round(self):
         if self._completed:
@@ -102,38 +185,16 @@ class Tournament:
         if len(self._rounds) >= self.number_of_rounds:
             return None
 
-        table = self.standings()
-        players = []
-        for row in table:
-            players.append(row["player_name"])
+        # Pairing only needs the points (sorting is stable: tied players keep their registration order),
+        # the tiebreaks are only computed for the standings
+        ranking = sorted(enumerate(self._points), key=itemgetter(1), reverse=True)
 
-        played_pairs = self._played_pairs()
-        waiting = players[:]
+        strategy = PAIRING_STRATEGIES[self.pairing]()
         new_round = Round()
+        for p1, p2 in strategy.pair(ranking, self._has_played_ids):
+            new_round.add_match(Match(self._names[p1], self._names[p2]))
 
-        while len(waiting) > 0:
-            p1 = waiting.pop(0)
-            candidate_indexes = []
-
-            i = 0
-            while i < len(waiting):
-                p2 = waiting[i]
-                pair_key = frozenset([p1, p2])
-                if pair_key not in played_pairs:
-                    candidate_indexes.append(i)
-                i += 1
-
-            if candidate_indexes:
-                chosen_index = random.choice(candidate_indexes)
-            else:
-                chosen_index = 0
-
-            p2 = waiting.pop(chosen_index)
-            match = Match(p1, p2)
-            new_round.add_match(match)
-
-        self._rounds.append(new_round)
-        self._current_round_index = len(self._rounds)
+        self._add_round(new_round)
         return new_round
 
     def advance_round(self):
@@ -154,12 +215,20 @@ class Tournament:
             return None
 
         if len(self._rounds) >= self.number_of_rounds:
-            self._completed = True
+            self._complete()
             return None
 
         return self.generate_next_round()
 
-    def set_match_result(self, round_number, match_number, winner=None):
+    def _complete(self):
+        self._completed = True
+        self._changes.append({"op": "completed"})
+
+    def iter_rounds(self):
+        """Yields (round number, round) for the rounds played or in progress"""
+        yield from enumerate(self._rounds, 1)
+
+    def get_match(self, round_number, match_number):
         round_index = round_number - 1
         match_index = match_number - 1
 
@@ -170,44 +239,105 @@ class Tournament:
         if match_index < 0 or match_index >= len(current_round.matches):
             return None
 
-        match = current_round.matches[match_index]
-        if winner is not None and winner not in match.players:
+        return current_round.matches[match_index]
+
+    def set_match_result(self, round_number, match_number, winner=None):
+        match = self.get_match(round_number, match_number)
+        if match is None:
+            return None
+        if winner is not None and not match.has_player(winner):
             return None
 
-        match.set_result(winner)
+        self._set_result(round_number, match_number, match, winner)
         return match
 
-    def standings(self):
-        points = {}
-        for name in self._player_names:
-            points[name] = 0
+    def set_match_results(self, results):
+        """Sets several results at once: results is a list of (round number, match number, winner).
+
+        All results are checked first: if one of them is invalid, nothing is changed and None is returned.
+        """
+        matches = []
+        for round_number, match_number, winner in results:
+            match = self.get_match(round_number, match_number)
+            if match is None:
+                return None
+            if winner is not None and not match.has_player(winner):
+                return None
+            matches.append((round_number, match_number, match, winner))
+
+        for round_number, match_number, match, winner in matches:
+            self._set_result(round_number, match_number, match, winner)
+        return [match for _, _, match, _ in matches]
+
+    def _set_result(self, round_number, match_number, match, winner):
+        # Take back the previous result (if any) before applying the new one
+        self._apply_match_points(match, -1)
+        self._rounds[round_number - 1].set_result(match, winner)
+        self._apply_match_points(match, 1)
+        self._changes.append({"op": "result", "round": round_number, "match": match_number, "winner": winner})
+
+    def _apply_match_points(self, match, sign):
+        if not match.completed:
+            return
+
+        p1 = self._intern(match.player_one_id)
+        p2 = self._intern(match.player_two_id)
+        winner = match.winner
+
+        if winner == match.player_one_id:
+            self._points[p1] += sign
+        elif winner == match.player_two_id:
+            self._points[p2] += sign
+        else:
+            self._points[p1] += sign * 0.5
+            self._points[p2] += sign * 0.5
+
+        self._ranking = None
+
+    def _rebuild_standings(self):
+        self._points = [0] * len(self._names)
 
         for rnd in self._rounds:
             for match in rnd.matches:
-                if not match.completed:
-                    continue
+                self._apply_match_points(match, 1)
 
-                p1 = match.players[0]
-                p2 = match.players[1]
-                winner = match.winner
-
-                if winner == p1:
-                    points[p1] += 1
-                elif winner == p2:
-                    points[p2] += 1
-                else:
-                    points[p1] += 0.5
-                    points[p2] += 0.5
+        self._ranking = None
 
-        ranking = []
+    def _tiebreak_values(self):
+        # Tiebreaks depend on the opponents' points, so they are computed for the whole table at once
+        if not self.tiebreaks:
+            return {}
 
-        for name, score in points.items():
-            ranking.append({"player_name": name, "points": score})
+        results = player_results(self._rounds, self._intern)
+        values = {}
+        for tiebreak in self.tiebreaks:
+            values[tiebreak] = TIEBREAKS[tiebreak](results, self._points)
+        return values
 
-        def get_points(item):
-            return item["points"]
-        ranking.sort(key=get_points, reverse=True)
-        return ranking
+    def standings(self):
+        # The ranking with the tiebreaks is only computed when the standings are requested, then cached
+        # until the next result (recording results and pairing rounds only update the points)
+        if self._ranking is None:
+            values = self._tiebreak_values()
+            ranking = []
+            for player_id, score in enumerate(self._points):
+                row_tiebreaks = tuple(values[tiebreak].get(player_id, 0) for tiebreak in self.tiebreaks)
+                ranking.append((player_id, score, row_tiebreaks))
+
+            # Sorting is stable: players still tied keep their registration order
+            ranking.sort(key=lambda item: (item[1], item[2]), reverse=True)
+            self._ranking = ranking
+
+        standings = []
+        for player_id, score, row_tiebreaks in self._ranking:
+            standings.append(
+                {
+                    "player_name": self._names[player_id],
+                    "points": score,
+                    "tiebreaks": dict(zip(self.tiebreaks, row_tiebreaks)),
+                }
+            )
+        return standings
 
     def finish_tournament(self):
         # Already finished
@@ -237,7 +367,7 @@ class Tournament:
                 }
 
         # Finish tournament
-        self._completed = True
+        self._complete()
         final_table = self.standings()
 
         winner = None
@@ -251,7 +381,8 @@ class Tournament:
             "standings": final_table,
         }
     
-    def serialize(self):
+    def header(self):
+        """Returns the serialized header fields (without the players and the rounds): cheap to call"""
         current_round = self._current_round_index
         if self._completed:
             current_round = None
@@ -266,13 +397,62 @@ class Tournament:
             "number_of_rounds": self.number_of_rounds,
             "current_round": current_round,
             "completed": self._completed,
+            "pairing": self.pairing,
+            "tiebreaks": self.tiebreaks[:],
+        }
+
+    def serialize(self):
+        return {
+            **self.header(),
             "players": self._player_names[:],
             "rounds": [rnd.serialize() for rnd in self._rounds],
         }
 
+    def encode(self):
+        """Returns the JSON text of serialize(): the rounds keep their JSON text (see Round.encode),
+        so only the rounds changed since the last call are encoded again"""
+        text = json.dumps({**self.header(), "players": self._player_names})
+        rounds = ", ".join(rnd.encode() for rnd in self._rounds)
+        return f'{text[:-1]}, "rounds": [{rounds}]}}'
+
+    @property
+    def journal(self):
+        if self._journal is None:
+            self._journal = Journal(self.filepath)
+        return self._journal
+
     def save(self):
-        with open(self.filepath, "w") as fp:
-            json.dump(self.serialize(), fp)
+        """Appends the changes to the journal (or writes the whole file, see Journal.save)"""
+        self.journal.save(self.encode, self._changes, snapshot=self._snapshot_needed)
+        self._changes = []
+        self._snapshot_needed = False
+
+    def _apply_change(self, change):
+        op = change["op"]
+        if op == "player":
+            if change["name"] not in self._ids:
+                self._intern(change["name"])
+                self._player_names.append(change["name"])
+                self._ranking = None
+        elif op == "round":
+            self._add_round(Round.from_list(change["matches"]))
+        elif op == "result":
+            self.set_match_result(change["round"], change["match"], change["winner"])
+        elif op == "completed":
+            self._completed = True
+
+    @classmethod
+    def load(cls, filepath):
+        """Loads a tournament from its JSON file, then replays the changes saved in its journal"""
+        with open(filepath) as fp:
+            data = json.load(fp)
+
+        tournament = cls.from_dict(data, filepath=filepath)
+        for change in tournament.journal.read(after_seq=data.get("journal_seq", 0)):
+            tournament._apply_change(change)
+        tournament._changes = []
+        tournament._snapshot_needed = False
+        return tournament
 
     @classmethod
     def from_dict(cls, data, filepath=None):
@@ -291,4 +471,6 @@ class Tournament:
             _player_names=data.get("players", []),
             _completed=data.get("completed", False),
             filepath=filepath,
+            pairing=data.get("pairing", "swiss"),
+            tiebreaks=data.get("tiebreaks"),
         )
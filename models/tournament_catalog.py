@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import timedelta
+from operator import itemgetter
+
+from .player_search import normalize_name
+
+
+class TournamentCatalog:
+    """
+    Summaries of the tournaments (see TournamentSummary) by file path, with indexes to query them
+    by status, venue, player and dates without going through every tournament.
+
+    Query results keep the order in which the tournaments were added.
+    """
+
+    def __init__(self):
+        # File path -> summary
+        self._summaries = {}
+        # Position of each file path, to sort query results
+        self._positions = {}
+        self._next_position = 0
+        # Indexes: value -> {file path: None} (dicts are used as ordered sets)
+        self._by_status = {True: {}, False: {}}
+        self._by_venue = {}
+        self._by_player = {}
+        # File path -> (start date, end date), and sorted lists of (start date, file path) and (end date, file path)
+        self._dates = {}
+        self._by_start_date = []
+        self._by_end_date = []
+        # Longest tournament: the ones ending after a date started at most this long before it
+        self._longest = timedelta(0)
+
+    def entries(self):
+        """Returns the list of (filepath, summary)"""
+        return list(self._summaries.items())
+
+    def add(self, filepath, summary):
+        """Adds a tournament, or replaces its summary"""
+        if filepath in self._summaries:
+            # The tournament keeps its position
+            self._unindex_summary(filepath, self._summaries[filepath])
+        else:
+            self._positions[filepath] = self._next_position
+            self._next_position += 1
+
+        self._summaries[filepath] = summary
+        self._by_status[summary.completed][filepath] = None
+        self._by_venue.setdefault(normalize_name(summary.venue), {})[filepath] = None
+        for player in summary.players:
+            self._by_player.setdefault(normalize_name(player), {})[filepath] = None
+        start_date, end_date = summary.start_date, summary.end_date
+        self._dates[filepath] = (start_date, end_date)
+        insort(self._by_start_date, (start_date, str(filepath), filepath))
+        insort(self._by_end_date, (end_date, str(filepath), filepath))
+        self._longest = max(self._longest, end_date - start_date)
+
+    def _unindex_summary(self, filepath, summary):
+        del self._by_status[summary.completed][filepath]
+        self._unindex(self._by_venue, normalize_name(summary.venue), filepath)
+        for player in summary.players:
+            self._unindex(self._by_player, normalize_name(player), filepath)
+        start_date, end_date = self._dates.pop(filepath)
+        self._by_start_date.remove((start_date, str(filepath), filepath))
+        self._by_end_date.remove((end_date, str(filepath), filepath))
+
+    def _unindex(self, index, key, filepath):
+        filepaths = index.get(key, {})
+        filepaths.pop(filepath, None)
+        if not filepaths:
+            index.pop(key, None)
+
+    def query(self, completed=None, venue=None, player=None, date_from=None, date_to=None):
+        """Returns the list of (filepath, summary) matching all the criteria given:
+        - completed: True or False
+        - venue: venue name (ignoring case and spaces)
+        - player: name or chess ID of a player (or a list of them, for the same player)
+        - date_from, date_to: dates (datetime.date); tournaments taking place (at least partly)
+          between these dates
+        """
+        candidates = []
+        if completed is not None:
+            candidates.append(self._by_status[completed])
+        if venue is not None:
+            candidates.append(self._by_venue.get(normalize_name(venue), {}))
+        if player is not None:
+            players = [player] if isinstance(player, str) else player
+            filepaths = {}
+            for value in players:
+                filepaths.update(self._by_player.get(normalize_name(value), {}))
+            candidates.append(filepaths)
+        if date_from is not None or date_to is not None:
+            candidates.append(self._between(date_from, date_to))
+
+        if not candidates:
+            return self.entries()
+
+        # Start with the smallest set of candidates
+        candidates.sort(key=len)
+        filepaths = [filepath for filepath in candidates[0] if all(filepath in other for other in candidates[1:])]
+        filepaths.sort(key=self._positions.get)
+        return [(filepath, self._summaries[filepath]) for filepath in filepaths]
+
+    def _between(self, date_from, date_to):
+        # Tournaments starting before date_to: by_start_date[first:started], where the ones starting before
+        # first (more than the longest tournament before date_from) cannot end after date_from;
+        # tournaments ending after date_from: by_end_date[ended:] (all bisected)
+        by_start_date, by_end_date = self._by_start_date, self._by_end_date
+        first, started, ended = 0, len(by_start_date), 0
+        if date_to is not None:
+            started = bisect_right(by_start_date, date_to, key=itemgetter(0))
+        if date_from is not None:
+            first = bisect_left(by_start_date, date_from - self._longest, key=itemgetter(0))
+            ended = bisect_left(by_end_date, date_from, key=itemgetter(0))
+
+        # Intersection: the tournaments of the smaller range are checked against the other date
+        filepaths = {}
+        if len(by_end_date) - ended <= started - first:
+            for i in range(ended, len(by_end_date)):
+                filepath = by_end_date[i][2]
+                if date_to is None or self._dates[filepath][0] <= date_to:
+                    filepaths[filepath] = None
+        else:
+            for i in range(first, started):
+                filepath = by_start_date[i][2]
+                if date_from is None or self._dates[filepath][1] >= date_from:
+                    filepaths[filepath] = None
+        return filepaths
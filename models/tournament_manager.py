@@ -1,37 +1,126 @@
 import json
+from functools import partial
 from pathlib import Path
 
+from .journal import Journal, file_key, write_snapshot
+from .loader import load_files
 from .tournament import Tournament
+from .tournament_catalog import TournamentCatalog
+from .tournament_summary import TournamentSummary
+
+
+def read_summary(filepath):
+    """Reads the summary of a tournament file, returns None if the file is not valid JSON
+    (runs in the loader processes)"""
+    try:
+        return TournamentSummary.read(filepath, Journal(filepath))
+    except json.JSONDecodeError:
+        return None
+
+
+def read_and_call(function, filepath):
+    """Calls function with the tournament stored in filepath (runs in the loader processes)"""
+    return function(Tournament.load(filepath))
 
 
 class TournamentManager:
     # LOAD TOURNAMENTS FROM .JSON FILES
+    # Only the summaries are read at startup (and cached in the catalog file),
+    # a tournament is fully loaded when it is used (see load_tournament)
 
-    def __init__(self, data_folder="data/tournaments"):
+    CATALOG_FILENAME = ".catalog"
+    # Changes when the cached summaries change format
+    CATALOG_VERSION = 2
+
+    def __init__(self, data_folder="data/tournaments", workers=None):
         datadir = Path(data_folder)
         self.data_folder = datadir
-        self.tournaments = []
+        # Number of processes used to read the tournament files (see loader.load_files)
+        self.workers = workers
+        # Summaries of the tournaments, by filepath
+        self.catalog = TournamentCatalog()
+        # Tournaments already loaded: filepath -> Tournament
+        self._loaded = {}
+        self._load_tournaments()
+
+    def _load_tournaments(self):
+        catalog_filepath = self.data_folder / self.CATALOG_FILENAME
+        try:
+            with open(catalog_filepath) as fp:
+                cached = json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            cached = {}
+        catalog = cached.get("tournaments", {}) if cached.get("version") == self.CATALOG_VERSION else {}
 
-        for filepath in datadir.iterdir():
+        entries = []
+        for filepath in self.data_folder.iterdir():
             if filepath.is_file() and filepath.suffix == ".json":
-                with open(filepath) as fp:
-                    data = json.load(fp)
-                self.tournaments.append((filepath, Tournament.from_dict(data, filepath=filepath)))
+                # A cached summary is valid while the file and its journal are unchanged
+                key = file_key(filepath)
+                entry = catalog.get(filepath.name)
+                if entry is not None and entry["key"] == key:
+                    entries.append((filepath, key, TournamentSummary.from_dict(entry["summary"])))
+                else:
+                    entries.append((filepath, key, None))
+
+        # Only the new or changed files are read
+        to_read = [filepath for filepath, _, summary in entries if summary is None]
+        read_summaries = dict(zip(to_read, load_files(read_summary, to_read, workers=self.workers)))
+
+        new_catalog = {}
+        for filepath, key, summary in entries:
+            if summary is None:
+                summary = read_summaries[filepath]
+                if summary is None:
+                    print(filepath, "is invalid JSON file.")
+                    continue
+            new_catalog[filepath.name] = {"key": key, "summary": summary.serialize()}
+            self.catalog.add(filepath, summary)
+
+        if new_catalog != catalog:
+            try:
+                write_snapshot(catalog_filepath, {"version": self.CATALOG_VERSION, "tournaments": new_catalog})
+            except OSError:
+                # The catalog is only a cache
+                pass
+
+    def read_tournament(self, filepath):
+        """Reads the tournament stored in filepath (without keeping it, see load_tournament)"""
+        return Tournament.load(filepath)
+
+    def state_key(self, filepath):
+        """Returns a value that changes when the tournament stored in filepath changes, without loading it"""
+        return file_key(filepath)
+
+    def load_tournament(self, filepath):
+        """Returns the full tournament stored in filepath (loaded once)"""
+        filepath = Path(filepath)
+        if filepath not in self._loaded:
+            self._loaded[filepath] = self.read_tournament(filepath)
+        return self._loaded[filepath]
+
+    def map_tournaments(self, function, filepaths):
+        """Returns the list of function(tournament) for the tournaments stored in filepaths, read with
+        the loader processes (function must be defined at module level, see loader.load_files)"""
+        return load_files(partial(read_and_call, function), filepaths, workers=self.workers)
+
+    def is_filepath_taken(self, filepath):
+        return filepath.exists()
+
+    def new_tournament(self, **kwargs):
+        """Creates a tournament (not saved yet) stored by this manager"""
+        return Tournament(**kwargs)
 
     def list_tournaments(self, include_completed=None):
-        if include_completed is None:
-            return self.tournaments[:]
+        """Returns a list of (filepath, summary)"""
+        return self.catalog.query(completed=include_completed)
 
-        filtered = []
-        for filepath, tournament in self.tournaments:
-            if tournament._completed == include_completed:
-                filtered.append((filepath, tournament))
-        return filtered
+    def find_tournaments(self, **criteria):
+        """Returns a list of (filepath, summary) matching the criteria (see TournamentCatalog.query)"""
+        return self.catalog.query(**criteria)
 
     def save_tournament(self, tournament):
         tournament.save()
-        for index, (filepath, _) in enumerate(self.tournaments):
-            if filepath == tournament.filepath:
-                self.tournaments[index] = (filepath, tournament)
-                return
-        self.tournaments.append((tournament.filepath, tournament))
+        filepath = Path(tournament.filepath)
+        self._loaded[filepath] = tournament
+        self.catalog.add(filepath, TournamentSummary.from_tournament(tournament))
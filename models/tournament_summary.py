@@ -0,0 +1,94 @@
+import json
+
+from .player import parse_date
+
+
+class TournamentSummary:
+    """
+    Header fields of a tournament, and its players: enough to list and filter tournaments without loading
+    their rounds and matches (see TournamentManager.load_tournament).
+    """
+
+    DATE_FORMAT = "%d-%m-%Y"
+    FIELDS = ("name", "venue", "date_from", "date_to", "number_of_rounds", "current_round", "completed", "players")
+
+    def __init__(
+        self, name, venue, date_from, date_to, number_of_rounds, current_round=None, completed=False, players=None
+    ):
+        self.name = name
+        self.venue = venue
+        # Dates are kept as text (dd-mm-yyyy), like in the JSON files
+        self.date_from = date_from
+        self.date_to = date_to
+        self.number_of_rounds = number_of_rounds
+        self.current_round = current_round
+        self.completed = completed
+        # Players as stored in the tournament (names or chess IDs)
+        self.players = players or []
+
+    def __str__(self):
+        return f"<{self.name}>"
+
+    @property
+    def player_count(self):
+        return len(self.players)
+
+    @property
+    def start_date(self):
+        return parse_date(self.date_from, self.DATE_FORMAT).date()
+
+    @property
+    def end_date(self):
+        return parse_date(self.date_to, self.DATE_FORMAT).date()
+
+    def serialize(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data[field] for field in cls.FIELDS})
+
+    @classmethod
+    def from_tournament_data(cls, data):
+        """Builds the summary from a serialized tournament (see Tournament.serialize)"""
+        dates = data.get("dates", {})
+        return cls(
+            name=data["name"],
+            venue=data["venue"],
+            date_from=dates["from"],
+            date_to=dates["to"],
+            number_of_rounds=data["number_of_rounds"],
+            current_round=data.get("current_round"),
+            completed=data.get("completed", False),
+            players=data.get("players", [])[:],
+        )
+
+    @classmethod
+    def from_tournament(cls, tournament):
+        return cls(
+            name=tournament.name,
+            venue=tournament.venue,
+            date_from=tournament.start_date.strftime(tournament.DATE_FORMAT),
+            date_to=tournament.end_date.strftime(tournament.DATE_FORMAT),
+            number_of_rounds=tournament.number_of_rounds,
+            current_round=None if tournament._completed else tournament._current_round_index,
+            completed=tournament._completed,
+            players=tournament._player_names[:],
+        )
+
+    @classmethod
+    def read(cls, filepath, journal):
+        """Reads the summary of a tournament file, including the changes saved in its journal"""
+        with open(filepath) as fp:
+            data = json.load(fp)
+
+        summary = cls.from_tournament_data(data)
+        for change in journal.read(after_seq=data.get("journal_seq", 0)):
+            if change["op"] == "player":
+                summary.players.append(change["name"])
+            elif change["op"] == "round":
+                summary.current_round = change["round"]
+            elif change["op"] == "completed":
+                summary.completed = True
+                summary.current_round = None
+        return summary
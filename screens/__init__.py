@@ -1,5 +1,6 @@
+from .chess_id_duplicates import ChessIdDuplicates
 from .clubs import ClubCreate, ClubView
 from .main_menu import MainMenu
 from .players import PlayerEdit, PlayerView
 
-__all__ = ["ClubCreate", "ClubView", "MainMenu", "PlayerView"]
+__all__ = ["ChessIdDuplicates", "ClubCreate", "ClubView", "MainMenu", "PlayerView"]
@@ -0,0 +1,25 @@
+from commands import ClubListCmd
+
+from .base_screen import BaseScreen
+
+
+class ChessIdDuplicates(BaseScreen):
+    """Screen displaying the chess IDs given to several players (in different clubs, or in the same one)"""
+
+    def __init__(self, duplicates):
+        self.duplicates = duplicates
+
+    def display(self):
+        if not self.duplicates:
+            print("No duplicate chess IDs.")
+            return
+
+        print("## Duplicate chess IDs")
+        for chess_id, owners in self.duplicates.items():
+            print(chess_id)
+            for club, player in owners:
+                print("   ", player.name, player.email, f"({club.name})")
+
+    def get_command(self):
+        self.input_string(prompt="Press Enter to go back to main menu")
+        return ClubListCmd()
@@ -1,4 +1,4 @@
-from commands import ExitCmd, NoopCmd
+from commands import ChessIdDuplicatesCmd, ExitCmd, NoopCmd
 
 from .base_screen import BaseScreen
 
@@ -16,6 +16,7 @@ class MainMenu(BaseScreen):
     def get_command(self):
         while True:
             print("Type C to create a club or a club number to view/edit it.")
+            print("Type D to list the chess IDs given to several players.")
             print("Type X to exit.")
             value = self.input_string()
             if value.isdigit():
@@ -24,5 +25,7 @@ class MainMenu(BaseScreen):
                     return NoopCmd("club-view", club=self.clubs[value - 1])
             elif value.upper() == "C":
                 return NoopCmd("club-create")
+            elif value.upper() == "D":
+                return ChessIdDuplicatesCmd()
             elif value.upper() == "X":
                 return ExitCmd()
@@ -1,4 +1,5 @@
 from commands import PlayerUpdateCmd
+from models import get_club_manager
 
 from ..base_screen import BaseScreen
 
@@ -15,7 +16,7 @@ class PlayerEdit(BaseScreen):
         attrs = [
             ("name", "Player name", self.input_string),
             ("email", "Email address", self.input_email),
-            ("chess_id", "Chess ID", self.input_chess_id),
+            ("chess_id", "Chess ID", self.input_unique_chess_id),
             ("birthday", "Birthday", self.input_birthday),
         ]
 
@@ -28,3 +29,18 @@ class PlayerEdit(BaseScreen):
             data[key] = func(**kwargs)
 
         return PlayerUpdateCmd(self.club, self.player, **data)
+
+    def input_unique_chess_id(self, **kwargs):
+        """Gets a Chess ID that no other player has, in any club"""
+        while True:
+            value = self.input_chess_id(**kwargs)
+            owners = [
+                (club, player)
+                for club, player in get_club_manager().chess_id_owners(value)
+                if player is not self.player
+            ]
+            if not owners:
+                return value
+
+            club, player = owners[0]
+            print(f"This Chess ID is already taken by {player.name} ({club.name})!")
@@ -0,0 +1,26 @@
+"""
+Updates the Elo ratings of the players with the rounds completed since the last update
+(see models/ratings.py), then prints the best ratings.
+
+python update_ratings.py
+python update_ratings.py --rebuild --top 50
+"""
+import argparse
+import time
+
+from controllers.tournament_controller import TournamentController
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the Elo ratings of the players.")
+    parser.add_argument("--rebuild", action="store_true", help="rate all the tournaments again")
+    parser.add_argument("--top", type=int, default=10, help="number of ratings printed")
+
+    args = parser.parse_args()
+    controller = TournamentController()
+    start = time.perf_counter()
+    games = controller.rating_engine.update(rebuild=args.rebuild)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(f"{games} games rated in {seconds:.2f}s ({games / seconds:.0f} games/s)")
+
+    for idx, row in enumerate(controller.get_ratings(limit=args.top), 1):
+        print(f"{idx}. {row['player_name']} - {row['rating']:.0f} ({row['games']} games)")
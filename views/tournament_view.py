@@ -8,6 +8,9 @@ class TournamentView:
         print("5 Start or continue a round")
         print("6 Record a match result")
         print("7 Create tournament")
+        print("8 Record the results of a whole round")
+        print("9 Find tournaments (by player, venue or year)")
+        print("R Player ratings (Elo)")
         print("X Exit")
         return input("Choice? ").strip()
 
@@ -27,20 +30,53 @@ class TournamentView:
         print("Chess ID:", player.chess_id)
         print("Birthday:", player.birthday)
 
+    def show_players(self, players):
+        if len(players) == 1:
+            self.show_player(players[0])
+            return
+        if not players:
+            print("Player not found.")
+            return
+        print(f"{len(players)} players share this name:")
+        for player in players:
+            print("")
+            self.show_player(player)
+
+    def choose_player(self, candidates):
+        """Lets the user pick one of the players found by a search"""
+        if not candidates:
+            print("Player not found.")
+            return None
+
+        print("Player not found. Did you mean:")
+        for idx, player in enumerate(candidates, 1):
+            print(f"{idx}. {player.name} ({player.chess_id})")
+
+        while True:
+            raw_value = input("Number (leave empty for none)? ").strip()
+            if raw_value == "":
+                return None
+            if raw_value.isdigit():
+                number = int(raw_value)
+                if 1 <= number <= len(candidates):
+                    return candidates[number - 1]
+            print("Invalid choice.")
+
     def choose_tournament(self, tournament_entries):
         if not tournament_entries:
             return None
 
         print("Choose a tournament:")
-        for idx, (filepath, tournament) in enumerate(tournament_entries, 1):
-            print(f"{idx}. {tournament.name} ({filepath.name})")
+        for idx, (filepath, summary) in enumerate(tournament_entries, 1):
+            print(f"{idx}. {summary.name} ({filepath.name})")
 
         while True:
             raw_value = input("Number? ").strip()
             if raw_value.isdigit():
                 number = int(raw_value)
                 if 1 <= number <= len(tournament_entries):
-                    return tournament_entries[number - 1][1]
+                    # Returns the file path of the tournament: it is only loaded once chosen
+                    return tournament_entries[number - 1][0]
             print("Invalid choice.")
 
     def show_tournament_basic_info(self, info):
@@ -62,10 +98,51 @@ class TournamentView:
         print("Tournament:", tournament_name)
         print("Points by player:")
         for row in ranking:
-            print(f"- {row['player_name']}: {row['points']}")
+            line = f"- {row['player_name']}: {row['points']}"
+            if row.get("tiebreaks"):
+                values = ", ".join(f"{name}: {value}" for name, value in row["tiebreaks"].items())
+                line += f" ({values})"
+            print(line)
+
+    def ask_tournament_search(self):
+        """Returns the search criteria (player, venue, year), or None if the year is invalid"""
+        print("Leave a criterion empty to ignore it.")
+        player = input("Player name or chess ID? ").strip()
+        venue = input("Venue? ").strip()
+        year = input("Year? ").strip()
+        if year and not year.isdigit():
+            return None
+        return {"player": player or None, "venue": venue or None, "year": int(year) if year else None}
 
-    def show_report_written(self, filepath):
-        print("Report written to:", filepath)
+    def show_tournaments(self, tournament_entries):
+        if not tournament_entries:
+            print("No tournament found.")
+            return
+        for filepath, summary in tournament_entries:
+            status = "completed" if summary.completed else "in progress"
+            print(f"{summary.name} - {summary.venue}, {summary.date_from} to {summary.date_to} ({status})")
+
+    def ask_report_format(self, formats):
+        """Returns the report format chosen in formats (the first one by default), or None if invalid"""
+        value = input(f"Report format? ({'/'.join(formats)}, default: {formats[0]}) ").strip().lower()
+        if not value:
+            return formats[0]
+        if value in formats:
+            return value
+        return None
+
+    def show_ratings(self, ratings):
+        if not ratings:
+            print("No completed round to rate yet.")
+            return
+        for idx, row in enumerate(ratings, 1):
+            print(f"{idx}. {row['player_name']} - {row['rating']:.0f} ({row['games']} games)")
+
+    def show_report_written(self, filepath, written=True):
+        if written:
+            print("Report written to:", filepath)
+        else:
+            print("Report unchanged since the last export:", filepath)
 
     def ask_round_number(self):
         raw_value = input("Round number? ").strip()
@@ -85,6 +162,43 @@ class TournamentView:
             return None
         return value
 
+    def ask_round_results(self):
+        """Gets the results of a round, pasted or loaded from a file.
+
+        Each line is "match number, winner" - with no winner for a draw.
+        Returns a list of (match number, winner), or None if a line is invalid.
+        """
+        filepath = input("Results file (leave empty to paste results)? ").strip()
+        if filepath:
+            try:
+                with open(filepath) as fp:
+                    lines = fp.read().splitlines()
+            except OSError:
+                print("Could not read file:", filepath)
+                return None
+        else:
+            print('One result per line: "match number, winner" (no winner for a draw).')
+            print("Finish with an empty line.")
+            lines = []
+            while True:
+                line = input()
+                if not line.strip():
+                    break
+                lines.append(line)
+
+        results = []
+        for line in lines:
+            if not line.strip():
+                continue
+            raw_number, _, raw_winner = line.partition(",")
+            raw_number = raw_number.strip()
+            if not raw_number.isdigit():
+                print("Invalid line:", line)
+                return None
+            winner = raw_winner.strip() or None
+            results.append((int(raw_number), winner))
+        return results
+
     def ask_main_menu_or_exit(self):
         while True:
             value = input("Main menu or exit? (m/x) ").strip().lower()
@@ -131,6 +245,12 @@ class TournamentView:
             return int(raw_value)
         return None
 
+    def ask_pairing_strategy(self):
+        value = input("Pairing strategy (swiss/greedy) [swiss]? ").strip().lower()
+        if value == "":
+            return "swiss"
+        return value
+
     def ask_tournament_player_names(self):
         value = input("Player names (comma-separated)? ").strip()
         if not value: